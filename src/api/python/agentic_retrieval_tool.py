@@ -26,6 +26,10 @@ import aiohttp
 
 logger = logging.getLogger(__name__)
 
+# Per-source content cap for formatted output (characters)
+MAX_SOURCE_CONTENT_CHARS = 2000
+TRUNCATION_MARKER = "...(truncated)"
+
 
 class ReasoningEffort(StrEnum):
     """Reasoning effort levels for agentic retrieval.
@@ -328,9 +332,9 @@ class AgenticRetrievalTool:
             score = source.get("reranker_score", 0)
             content = source.get("content", "")
 
-            # Truncate very long content
-            if len(content) > 2000:
-                content = content[:2000] + "...(truncated)"
+            # Truncate very long content (single slice, no re-scan)
+            if len(content) > MAX_SOURCE_CONTENT_CHARS:
+                content = content[:MAX_SOURCE_CONTENT_CHARS] + TRUNCATION_MARKER
 
             citation = f"【ref_{ref_id}†relevance:{score:.2f}】"
             formatted.append(f"{citation}\n{content}")
@@ -348,9 +352,9 @@ class AgenticRetrievalTool:
                 ms = act.get("elapsed_ms", 0)
                 activity_info.append(f"{ks}: {count}件 ({ms}ms)")
 
-        footer = f"\n\n---\n📊 Reasoning Effort: {result.get('reasoning_effort', 'unknown')}"
-        if activity_info:
-            footer += f" | {' | '.join(activity_info)}"
+        footer_parts = [f"📊 Reasoning Effort: {result.get('reasoning_effort', 'unknown')}"]
+        footer_parts.extend(activity_info)
+        footer = "\n\n---\n" + " | ".join(footer_parts)
 
         return "\n\n---\n\n".join(formatted) + footer
 
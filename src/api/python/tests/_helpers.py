@@ -0,0 +1,17 @@
+"""
+Shared helpers for Python API unit tests.
+"""
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # orjson is optional for tests
+    import json
+
+    loads = json.loads
+
+
+def find_middleware(app, name: str):
+    """Return the first user middleware on the app whose class name matches, or None."""
+    return next((m for m in app.user_middleware if m.cls.__name__ == name), None)
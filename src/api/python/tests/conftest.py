@@ -10,8 +10,9 @@ This file is automatically loaded by pytest and provides:
 import os
 import sys
 from collections.abc import Generator
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, create_autospec, patch
 
+import pyodbc
 import pytest
 from fastapi.testclient import TestClient
 
@@ -23,32 +24,53 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Environment Fixtures
 # ============================================================================
 
+# Test defaults for the required environment variables. They are applied to
+# os.environ when this conftest is imported, i.e. before test modules (and the
+# app modules they import at module level) are collected, so import-time
+# constants such as AGENT_MODE never pick up the developer's shell or .env.
+_TEST_ENV_VARS = {
+    # Azure AI Foundry
+    "AZURE_AI_AGENT_ENDPOINT": "https://test-foundry.openai.azure.com/",
+    "AZURE_OPENAI_ENDPOINT": "https://test-openai.openai.azure.com/",
+    "AZURE_OPENAI_API_KEY": "test-key-12345",
+    "AZURE_OPENAI_DEPLOYMENT": "gpt-4o",
+    # Agent Configuration
+    "AGENT_NAME_TITLE": "Test Agent",
+    "AGENT_MODE": "multi_tool",
+    "MULTI_AGENT_MODE": "false",
+    "DEMO_MODE": "false",
+    # Database (Fabric SQL)
+    "FABRIC_SQL_CONNECTION_STRING": "Driver={ODBC Driver 18 for SQL Server};Server=test.database.fabric.microsoft.com;Database=testdb;Encrypt=yes;TrustServerCertificate=no;",
+    # Application Insights (disabled for tests)
+    "APPLICATIONINSIGHTS_CONNECTION_STRING": "",
+}
+os.environ.update(_TEST_ENV_VARS)
+
 
 @pytest.fixture(autouse=True)
 def mock_env_vars(monkeypatch) -> None:
     """
     Set up required environment variables for testing.
-    This fixture runs automatically for all tests.
-    """
-    env_vars = {
-        # Azure AI Foundry
-        "AZURE_AI_AGENT_ENDPOINT": "https://test-foundry.openai.azure.com/",
-        "AZURE_OPENAI_ENDPOINT": "https://test-openai.openai.azure.com/",
-        "AZURE_OPENAI_API_KEY": "test-key-12345",
-        "AZURE_OPENAI_DEPLOYMENT": "gpt-4o",
-        # Agent Configuration
-        "AGENT_NAME_TITLE": "Test Agent",
-        "AGENT_MODE": "multi_tool",
-        "MULTI_AGENT_MODE": "false",
-        # Database (Fabric SQL)
-        "FABRIC_SQL_CONNECTION_STRING": "Driver={ODBC Driver 18 for SQL Server};Server=test.database.fabric.microsoft.com;Database=testdb;Encrypt=yes;TrustServerCertificate=no;",
-        # Application Insights (disabled for tests)
-        "APPLICATIONINSIGHTS_CONNECTION_STRING": "",
-    }
-    for key, value in env_vars.items():
+    This fixture runs automatically for all tests and restores the defaults
+    in case an earlier test changed them.
+    """
+    for key, value in _TEST_ENV_VARS.items():
         monkeypatch.setenv(key, value)
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _preload_modules() -> None:
+    """
+    Import the heavy application modules once per session.
+
+    chat/history_sql pull in Agent Framework, Azure SDKs and pyodbc, so
+    paying their import cost up front keeps it out of individual tests.
+    """
+    import app  # noqa: F401
+    import chat  # noqa: F401
+    import history_sql  # noqa: F401
+
+
 # ============================================================================
 # Mock Fixtures for Azure Services
 # ============================================================================
@@ -74,26 +96,69 @@ def mock_azure_credential_async():
         yield mock_credential
 
 
+@pytest.fixture(scope="module")
+def _pyodbc_mock_tree():
+    """
+    Build the pyodbc connect/connection/cursor mock tree once per module.
+
+    ``create_autospec`` introspects the pyodbc types up front, so tests in the
+    module share that cost and get attribute checking on every method call.
+    """
+    mock_connect = create_autospec(pyodbc.connect)
+    mock_conn = create_autospec(pyodbc.Connection, instance=True)
+    mock_cursor = create_autospec(pyodbc.Cursor, instance=True)
+    return {
+        "connect": mock_connect,
+        "connection": mock_conn,
+        "cursor": mock_cursor,
+    }
+
+
 @pytest.fixture
-def mock_pyodbc_connection():
+def mock_pyodbc_connection(_pyodbc_mock_tree):
     """Mock pyodbc database connection for Fabric SQL."""
-    with patch("pyodbc.connect") as mock_connect:
-        mock_conn = MagicMock()
-        mock_cursor = MagicMock()
+    mock_connect = _pyodbc_mock_tree["connect"]
+    mock_conn = _pyodbc_mock_tree["connection"]
+    mock_cursor = _pyodbc_mock_tree["cursor"]
+
+    # Reuse the module-scoped tree; clear state left by the previous test
+    for mock in _pyodbc_mock_tree.values():
+        mock.reset_mock(return_value=True, side_effect=True)
+
+    # Default: return empty results
+    mock_cursor.fetchall.return_value = []
+    mock_cursor.fetchone.return_value = None
+    mock_cursor.description = []
 
-        # Default: return empty results
-        mock_cursor.fetchall.return_value = []
-        mock_cursor.fetchone.return_value = None
-        mock_cursor.description = []
+    mock_conn.cursor.return_value = mock_cursor
+    mock_connect.return_value = mock_conn
+
+    with patch("pyodbc.connect", new=mock_connect):
+        yield _pyodbc_mock_tree
+
+
+@pytest.fixture
+def sql_connection_factory(_pyodbc_mock_tree):
+    """
+    Return a factory that configures the shared mock connection for one query.
 
+    Usage: ``conn, cursor = sql_connection_factory(["id", "name"], [(1, "Alice")])``.
+    Pass ``execute_error`` to make ``cursor.execute`` raise instead.
+    """
+    mock_conn = _pyodbc_mock_tree["connection"]
+    mock_cursor = _pyodbc_mock_tree["cursor"]
+
+    def _factory(columns=(), rows=(), execute_error=None):
+        mock_conn.reset_mock(return_value=True, side_effect=True)
+        mock_cursor.reset_mock(return_value=True, side_effect=True)
+        mock_cursor.description = [(name,) for name in columns]
+        mock_cursor.fetchall.return_value = list(rows)
+        if execute_error is not None:
+            mock_cursor.execute.side_effect = execute_error
         mock_conn.cursor.return_value = mock_cursor
-        mock_connect.return_value = mock_conn
+        return mock_conn, mock_cursor
 
-        yield {
-            "connect": mock_connect,
-            "connection": mock_conn,
-            "cursor": mock_cursor,
-        }
+    return _factory
 
 
 @pytest.fixture
@@ -111,22 +176,61 @@ def mock_chat_agent():
 # ============================================================================
 
 
-@pytest.fixture
-def test_client() -> Generator[TestClient, None, None]:
+@pytest.fixture(scope="session")
+def default_app():
     """
-    Create a FastAPI test client for API endpoint testing.
+    Build the FastAPI app once per session with default configuration.
 
-    Note: This fixture imports app lazily to avoid import errors
-    when environment variables are not set.
+    CORS_ALLOWED_ORIGINS is cleared while building so the app reflects the
+    defaults regardless of the developer's shell or .env file.
     """
-    # Import after env vars are set
     from app import build_app
 
-    app = build_app()
-    with TestClient(app) as client:
+    with pytest.MonkeyPatch.context() as mp:
+        mp.delenv("CORS_ALLOWED_ORIGINS", raising=False)
+        return build_app()
+
+
+@pytest.fixture(scope="session")
+def test_client(default_app) -> Generator[TestClient, None, None]:
+    """
+    Create a FastAPI test client for API endpoint testing.
+
+    Session-scoped so app construction and lifespan startup run once.
+    Endpoints read environment variables per request, so function-scoped
+    monkeypatching still applies. Use ``fresh_client`` for tests that
+    mutate environment or patch app-level state.
+    """
+    with TestClient(default_app) as client:
         yield client
 
 
+@pytest.fixture(scope="session")
+def health_response(test_client):
+    """
+    GET /health once per session and share the response.
+
+    FABRIC_SQL_SERVER is cleared for the request so the DB probe is skipped.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.delenv("FABRIC_SQL_SERVER", raising=False)
+        return test_client.get("/health")
+
+
+@pytest.fixture
+def fresh_client() -> TestClient:
+    """
+    Create a per-test FastAPI test client isolated from the session client.
+
+    The client is not entered as a context manager, so lifespan startup and
+    shutdown are skipped. Only use it for endpoints that do not depend on
+    lifespan-initialized state (e.g. /health).
+    """
+    from app import build_app
+
+    return TestClient(build_app())
+
+
 # ============================================================================
 # Test Data Fixtures
 # ============================================================================
@@ -322,7 +322,6 @@ class TestParseRetrieveResponse:
 class TestRetrieveFormatted:
     """Tests for AgenticRetrievalTool.retrieve_formatted."""
 
-    @pytest.mark.asyncio
     async def test_error_result_returns_error_message(self):
         """When retrieve returns error, formatted message is returned."""
         tool = AgenticRetrievalTool(
@@ -334,7 +333,6 @@ class TestRetrieveFormatted:
             result = await tool.retrieve_formatted("test query")
             assert "エラー" in result
 
-    @pytest.mark.asyncio
     async def test_no_sources_returns_not_found_message(self):
         """When no sources found, appropriate message is returned."""
         tool = AgenticRetrievalTool(
@@ -346,7 +344,6 @@ class TestRetrieveFormatted:
             result = await tool.retrieve_formatted("test query")
             assert "見つかりません" in result
 
-    @pytest.mark.asyncio
     async def test_formatted_output_contains_citations(self):
         """Formatted output should contain ref citations and scores."""
         tool = AgenticRetrievalTool(
@@ -366,7 +363,6 @@ class TestRetrieveFormatted:
             assert "0.92" in result
             assert "Product A specs" in result
 
-    @pytest.mark.asyncio
     async def test_long_content_truncated(self):
         """Content longer than 2000 chars should be truncated."""
         tool = AgenticRetrievalTool(
@@ -393,7 +389,6 @@ class TestRetrieveFormatted:
 class TestAgenticKnowledgeRetrieve:
     """Tests for the module-level agentic_knowledge_retrieve function."""
 
-    @pytest.mark.asyncio
     async def test_returns_not_configured_without_env(self, monkeypatch):
         """Should return 'not configured' message when env vars are missing."""
         monkeypatch.delenv("AI_SEARCH_ENDPOINT", raising=False)
@@ -404,7 +399,6 @@ class TestAgenticKnowledgeRetrieve:
             result = await agentic_knowledge_retrieve("test query")
             assert "設定されていません" in result
 
-    @pytest.mark.asyncio
     async def test_invalid_reasoning_effort_defaults_to_low(self, monkeypatch):
         """Invalid reasoning effort string should default to 'low'."""
         monkeypatch.setenv("AI_SEARCH_ENDPOINT", "https://search.windows.net")
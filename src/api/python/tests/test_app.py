@@ -2,49 +2,48 @@
 Unit tests for app.py - FastAPI application setup and health endpoints.
 """
 
+import pytest
+from app import APP_VERSION
+from fastapi import FastAPI
+
 
 class TestAppConfiguration:
     """Tests for application configuration and setup."""
 
+    @pytest.fixture(scope="module")
+    def built_app(self, default_app):
+        """Reuse the session-wide app for all configuration checks."""
+        return default_app
+
     def test_app_version_exists(self):
         """Verify that app version is defined."""
-        from app import APP_VERSION
-
         assert APP_VERSION is not None
         assert isinstance(APP_VERSION, str)
         assert len(APP_VERSION) > 0
 
-    def test_build_app_creates_fastapi_instance(self):
+    def test_build_app_creates_fastapi_instance(self, built_app):
         """Verify that build_app creates a valid FastAPI instance."""
-        from fastapi import FastAPI
-
-        from app import build_app
-
-        app = build_app()
+        assert isinstance(built_app, FastAPI)
+        assert (
+            built_app.title
+            == "Agentic Applications for Unified Data Foundation Solution Accelerator"
+        )
 
-        assert isinstance(app, FastAPI)
-        assert app.title == "Agentic Applications for Unified Data Foundation Solution Accelerator"
-
-    def test_cors_middleware_configured(self):
+    def test_cors_middleware_configured(self, built_app):
         """Verify that CORS middleware is properly configured."""
-        from app import build_app
-
-        app = build_app()
-
-        # Check that middleware is added
-        middleware_classes = [m.cls.__name__ for m in app.user_middleware]
-        assert "CORSMiddleware" in middleware_classes
+        # build_app() registers CORS before the request logging middleware and
+        # Starlette prepends each add_middleware() call, so CORS is always the
+        # innermost (last) entry. Index directly so an ordering change fails loudly.
+        assert built_app.user_middleware[-1].cls.__name__ == "CORSMiddleware"
 
 
 class TestHealthEndpoints:
     """Tests for health check endpoints."""
 
-    def test_health_endpoint_returns_ok(self, test_client):
+    def test_health_endpoint_returns_ok(self, health_response):
         """Health endpoint should return 200 OK."""
-        response = test_client.get("/health")
-
-        assert response.status_code == 200
-        data = response.json()
+        assert health_response.status_code == 200
+        data = health_response.json()
         assert data["status"] == "healthy"
 
     def test_root_endpoint_returns_welcome(self, test_client):
@@ -60,32 +59,19 @@ class TestHealthEndpoints:
 class TestAPIRouterRegistration:
     """Tests for API router registration."""
 
-    def test_chat_router_registered(self):
-        """Verify chat router is registered under /api prefix."""
-        from app import build_app
+    @pytest.fixture(scope="module")
+    def app_routes(self, default_app):
+        """Collect the route paths of the session-wide app once."""
+        return [r.path for r in default_app.routes]
 
-        app = build_app()
-        routes = [r.path for r in app.routes]
-
-        # Check for chat-related routes
-        assert any("/api" in route for route in routes)
+    def test_chat_router_registered(self, app_routes):
+        """Verify chat router is registered under /api prefix."""
+        assert any("/api" in route for route in app_routes)
 
-    def test_history_router_registered(self):
+    def test_history_router_registered(self, app_routes):
         """Verify history router is registered under /history prefix."""
-        from app import build_app
+        assert any("/history" in route for route in app_routes)
 
-        app = build_app()
-        routes = [r.path for r in app.routes]
-
-        # Check for history-related routes
-        assert any("/history" in route for route in routes)
-
-    def test_historyfab_router_registered(self):
+    def test_historyfab_router_registered(self, app_routes):
         """Verify Fabric SQL history router is registered under /historyfab prefix."""
-        from app import build_app
-
-        app = build_app()
-        routes = [r.path for r in app.routes]
-
-        # Check for historyfab-related routes
-        assert any("/historyfab" in route for route in routes)
+        assert any("/historyfab" in route for route in app_routes)
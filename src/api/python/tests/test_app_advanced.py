@@ -7,15 +7,29 @@ Extends test_app.py with:
 - Lifespan cleanup logic
 """
 
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock, patch
 
-from fastapi.testclient import TestClient
+import pyodbc
+import pytest
+from app import build_app
+
+from tests._helpers import find_middleware
+
+_GET_CONN_PATH = "history_sql.get_fabric_db_connection"
 
 # ============================================================================
 # /health endpoint — DB connectivity branching
 # ============================================================================
 
 
+@pytest.fixture
+def fabric_client(monkeypatch, fresh_client):
+    """Test client with FABRIC_SQL_SERVER configured so /health probes the DB."""
+    monkeypatch.setenv("FABRIC_SQL_SERVER", "test-server.database.fabric.microsoft.com")
+    return fresh_client
+
+
 class TestHealthCheckDBBranching:
     """Tests for /health endpoint with different database states."""
 
@@ -27,78 +41,26 @@ class TestHealthCheckDBBranching:
         assert data["database"] == "not_configured"
         assert data["status"] == "healthy"
 
-    def test_health_db_connected(self, test_client, monkeypatch):
-        """DB status should be 'connected' when connection succeeds."""
-        monkeypatch.setenv("FABRIC_SQL_SERVER", "test-server.database.fabric.microsoft.com")
-
-        mock_cursor = MagicMock()
-        mock_conn = MagicMock()
-        mock_conn.cursor.return_value = mock_cursor
-
-        with patch("app.build_app"):
-            # Re-import to get fresh test_client is complex.
-            # Instead, test against a fresh app instance.
-            pass
-
-        # Build a fresh app to pick up the env var
-        from app import build_app
-
-        app = build_app()
-        with (
-            TestClient(app) as client,
-            patch(
-                "history_sql.get_fabric_db_connection",
-                new_callable=AsyncMock,
-                return_value=mock_conn,
-            ),
-        ):
-            response = client.get("/health")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["database"] == "connected"
-            assert data["status"] == "healthy"
-
-    def test_health_db_unavailable(self, monkeypatch):
-        """DB status should be 'unavailable' when connection returns None."""
-        monkeypatch.setenv("FABRIC_SQL_SERVER", "test-server.database.fabric.microsoft.com")
-
-        from app import build_app
-
-        app = build_app()
-        with (
-            TestClient(app) as client,
-            patch(
-                "history_sql.get_fabric_db_connection",
-                new_callable=AsyncMock,
-                return_value=None,
-            ),
-        ):
-            response = client.get("/health")
-            assert response.status_code == 200
-            data = response.json()
-            assert data["database"] == "unavailable"
-            assert data["status"] == "degraded"
-
-    def test_health_db_exception(self, monkeypatch):
-        """DB status should be 'unavailable' when connection throws."""
-        monkeypatch.setenv("FABRIC_SQL_SERVER", "test-server.database.fabric.microsoft.com")
-
-        from app import build_app
-
-        app = build_app()
-        with (
-            TestClient(app) as client,
-            patch(
-                "history_sql.get_fabric_db_connection",
-                new_callable=AsyncMock,
-                side_effect=Exception("Connection timeout"),
-            ),
-        ):
-            response = client.get("/health")
+    @pytest.mark.parametrize(
+        ("mock_kwargs", "expected_db", "expected_status"),
+        [
+            # Connection succeeds
+            ({"return_value": MagicMock(spec=pyodbc.Connection)}, "connected", "healthy"),
+            # Connection returns None
+            ({"return_value": None}, "unavailable", "degraded"),
+            # Connection throws
+            ({"side_effect": Exception("Connection timeout")}, "unavailable", "degraded"),
+        ],
+        ids=["connected", "unavailable", "exception"],
+    )
+    def test_health_db_status(self, fabric_client, mock_kwargs, expected_db, expected_status):
+        """DB status should follow the result of the connection probe."""
+        with patch(_GET_CONN_PATH, new=AsyncMock(**mock_kwargs)):
+            response = fabric_client.get("/health")
             assert response.status_code == 200
             data = response.json()
-            assert data["database"] == "unavailable"
-            assert data["status"] == "degraded"
+            assert data["database"] == expected_db
+            assert data["status"] == expected_status
 
 
 # ============================================================================
@@ -106,40 +68,39 @@ class TestHealthCheckDBBranching:
 # ============================================================================
 
 
+def _get_cors_origins(monkeypatch, env_value: str) -> list[str]:
+    """Build the app with CORS_ALLOWED_ORIGINS set and return allow_origins."""
+    monkeypatch.setenv("CORS_ALLOWED_ORIGINS", env_value)
+    cors_middleware = find_middleware(build_app(), "CORSMiddleware")
+    assert cors_middleware is not None
+    return cors_middleware.kwargs.get("allow_origins", [])
+
+
 class TestCORSOrigins:
     """Tests for CORS origins configuration."""
 
-    def test_default_cors_is_wildcard(self, monkeypatch):
+    def test_default_cors_is_wildcard(self, default_app):
         """Default CORS should allow all origins (*)."""
-        monkeypatch.delenv("CORS_ALLOWED_ORIGINS", raising=False)
-        from app import build_app
-
-        app = build_app()
-        # Find the CORS middleware
-        cors_middleware = None
-        for middleware in app.user_middleware:
-            if middleware.cls.__name__ == "CORSMiddleware":
-                cors_middleware = middleware
-                break
+        cors_middleware = find_middleware(default_app, "CORSMiddleware")
         assert cors_middleware is not None
         assert "*" in cors_middleware.kwargs.get("allow_origins", [])
 
-    def test_custom_cors_origins(self, monkeypatch):
+    @pytest.mark.parametrize(
+        ("env_value", "expected_origins"),
+        [
+            ("https://app.example.com", ["https://app.example.com"]),
+            (
+                "https://app.example.com,https://admin.example.com",
+                ["https://app.example.com", "https://admin.example.com"],
+            ),
+        ],
+        ids=["single_origin", "multiple_origins"],
+    )
+    def test_custom_cors_origins(self, monkeypatch, env_value, expected_origins):
         """Custom CORS origins should be parsed from comma-separated string."""
-        monkeypatch.setenv(
-            "CORS_ALLOWED_ORIGINS", "https://app.example.com,https://admin.example.com"
-        )
-        from app import build_app
-
-        app = build_app()
-        cors_middleware = None
-        for middleware in app.user_middleware:
-            if middleware.cls.__name__ == "CORSMiddleware":
-                cors_middleware = middleware
-                break
-        origins = cors_middleware.kwargs.get("allow_origins", [])
-        assert "https://app.example.com" in origins
-        assert "https://admin.example.com" in origins
+        origins = _get_cors_origins(monkeypatch, env_value)
+        for origin in expected_origins:
+            assert origin in origins
 
 
 # ============================================================================
@@ -150,10 +111,9 @@ class TestCORSOrigins:
 class TestHealthResponseSchema:
     """Tests for /health endpoint response structure completeness."""
 
-    def test_health_response_contains_all_required_fields(self, test_client):
+    def test_health_response_contains_all_required_fields(self, health_response):
         """Health response should contain all expected fields."""
-        response = test_client.get("/health")
-        data = response.json()
+        data = health_response.json()
         required_fields = [
             "status",
             "version",
@@ -167,17 +127,12 @@ class TestHealthResponseSchema:
         for field in required_fields:
             assert field in data, f"Missing field: {field}"
 
-    def test_health_platform_is_foundry(self, test_client):
+    def test_health_platform_is_foundry(self, health_response):
         """Platform field should always be 'Microsoft Foundry'."""
-        response = test_client.get("/health")
-        data = response.json()
+        data = health_response.json()
         assert data["platform"] == "Microsoft Foundry"
 
-    def test_health_timestamp_is_iso_format(self, test_client):
+    def test_health_timestamp_is_iso_format(self, health_response):
         """Timestamp should be valid ISO format."""
-        response = test_client.get("/health")
-        data = response.json()
         # Should not raise
-        from datetime import datetime
-
-        datetime.fromisoformat(data["timestamp"])
+        datetime.fromisoformat(health_response.json()["timestamp"])
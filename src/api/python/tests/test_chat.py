@@ -7,130 +7,126 @@ input validation, and demo mode responses.
 
 import json
 
+import chat
+import pytest
+from chat import (
+    _build_query_with_history,
+    _build_reasoning_options,
+    create_tool_event,
+    get_demo_response,
+    get_model_params,
+    get_reasoning_effort,
+    get_web_citations,
+    is_chart_request,
+    select_agent_mode,
+    set_model_params,
+    set_reasoning_effort,
+    set_web_citations,
+)
+
+# Exceeds the /api/chat MAX_QUERY_LENGTH (10000 chars)
+_OVERLONG_QUERY = "x" * 11000
+
+
+_TOOL_EVENT_PREFIX = "__TOOL_EVENT__"
+_TOOL_EVENT_SUFFIX = "__END_TOOL_EVENT__"
+_PREFIX_LEN = len(_TOOL_EVENT_PREFIX)
+_SUFFIX_LEN = len(_TOOL_EVENT_SUFFIX)
+
+
+def _parse_tool_event(event: str) -> dict:
+    """Strip the tool event markers and decode the JSON payload."""
+    return json.loads(event[_PREFIX_LEN:-_SUFFIX_LEN])
+
 
 class TestCreateToolEvent:
     """Tests for create_tool_event() — pure function generating JSON markers."""
 
-    def test_basic_tool_event(self):
-        """正常系: started ステータスのツールイベント生成"""
-        from chat import create_tool_event
-
-        result = create_tool_event("run_sql_query", "started")
-        assert result.startswith("__TOOL_EVENT__")
-        assert result.endswith("__END_TOOL_EVENT__")
-        payload = json.loads(
-            result.removeprefix("__TOOL_EVENT__").removesuffix("__END_TOOL_EVENT__")
-        )
+    @pytest.mark.parametrize(
+        ("tool_name", "status", "message", "expected"),
+        [
+            # 正常系: started ステータスのツールイベント生成
+            ("run_sql_query", "started", None, {"tool": "run_sql_query", "status": "started"}),
+            # メッセージ付きのツールイベント
+            (
+                "search_documents",
+                "completed",
+                "3件取得しました",
+                {"tool": "search_documents", "status": "completed", "message": "3件取得しました"},
+            ),
+            # error ステータスのツールイベント
+            ("search_web", "error", "Timeout", {"status": "error", "message": "Timeout"}),
+            # 日本語メッセージが JSON 上で保持されること
+            ("test_tool", "completed", "日本語メッセージ", {"message": "日本語メッセージ"}),
+        ],
+        ids=["basic", "with_message", "error_status", "japanese_message"],
+    )
+    def test_create_tool_event(self, tool_name, status, message, expected):
+        """マーカーで囲まれた JSON に期待フィールドが含まれること"""
+        result = create_tool_event(tool_name, status, message)
+        assert result.startswith(_TOOL_EVENT_PREFIX)
+        assert result.endswith(_TOOL_EVENT_SUFFIX)
+        payload = _parse_tool_event(result)
         assert payload["type"] == "tool_event"
-        assert payload["tool"] == "run_sql_query"
-        assert payload["status"] == "started"
         assert "timestamp" in payload
-        assert "message" not in payload
-
-    def test_tool_event_with_message(self):
-        """メッセージ付きのツールイベント"""
-        from chat import create_tool_event
-
-        result = create_tool_event("search_documents", "completed", "3件取得しました")
-        payload = json.loads(
-            result.removeprefix("__TOOL_EVENT__").removesuffix("__END_TOOL_EVENT__")
-        )
-        assert payload["message"] == "3件取得しました"
-        assert payload["tool"] == "search_documents"
-        assert payload["status"] == "completed"
-
-    def test_tool_event_error_status(self):
-        """error ステータスのツールイベント"""
-        from chat import create_tool_event
-
-        result = create_tool_event("search_web", "error", "Timeout")
-        payload = json.loads(
-            result.removeprefix("__TOOL_EVENT__").removesuffix("__END_TOOL_EVENT__")
-        )
-        assert payload["status"] == "error"
-        assert payload["message"] == "Timeout"
-
-    def test_tool_event_none_message_excluded(self):
-        """message=None の場合は JSON に message キーなし"""
-        from chat import create_tool_event
-
-        result = create_tool_event("run_sql_query", "started", None)
-        payload = json.loads(
-            result.removeprefix("__TOOL_EVENT__").removesuffix("__END_TOOL_EVENT__")
-        )
-        assert "message" not in payload
-
-    def test_tool_event_json_is_valid(self):
-        """JSON として valid であること"""
-        from chat import create_tool_event
-
-        result = create_tool_event("test_tool", "completed", "日本語メッセージ")
-        inner = result.removeprefix("__TOOL_EVENT__").removesuffix("__END_TOOL_EVENT__")
-        parsed = json.loads(inner)
-        assert isinstance(parsed, dict)
+        for key, value in expected.items():
+            assert payload[key] == value
+        # message=None の場合は JSON に message キーなし
+        if message is None:
+            assert "message" not in payload
 
 
 class TestSelectAgentMode:
     """Tests for select_agent_mode() — query-based mode selection."""
 
-    def test_greeting_returns_sql_only(self):
-        """挨拶クエリ → sql_only"""
-        from chat import select_agent_mode
-
-        assert select_agent_mode("こんにちは") == "sql_only"
-        assert select_agent_mode("hello") == "sql_only"
-        assert select_agent_mode("ありがとう") == "sql_only"
-
-    def test_simple_sql_query_returns_sql_only(self):
-        """単純なSQL系クエリ → sql_only"""
-        from chat import select_agent_mode
-
-        assert select_agent_mode("売上TOP5を見せて") == "sql_only"
-        assert select_agent_mode("顧客一覧を出して") == "sql_only"
-        assert select_agent_mode("注文何件ある？") == "sql_only"
-
-    def test_complex_query_returns_multi_tool(self):
-        """複合クエリ → multi_tool"""
-        from chat import select_agent_mode
-
-        assert select_agent_mode("売上データとスペックを比較して") == "multi_tool"
-        assert select_agent_mode("最新のトレンドを教えて") == "multi_tool"
-
-    def test_general_query_returns_multi_tool(self):
-        """汎用クエリ → multi_tool (デフォルト)"""
-        from chat import select_agent_mode
-
-        assert select_agent_mode("製品について教えてください") == "multi_tool"
-        assert select_agent_mode("Why is revenue declining?") == "multi_tool"
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            # 挨拶クエリ → sql_only
+            ("こんにちは", "sql_only"),
+            ("hello", "sql_only"),
+            ("ありがとう", "sql_only"),
+            # 単純なSQL系クエリ → sql_only
+            ("売上TOP5を見せて", "sql_only"),
+            ("顧客一覧を出して", "sql_only"),
+            ("注文何件ある？", "sql_only"),
+            # 複合クエリ → multi_tool
+            ("売上データとスペックを比較して", "multi_tool"),
+            ("最新のトレンドを教えて", "multi_tool"),
+            # 汎用クエリ → multi_tool (デフォルト)
+            ("製品について教えてください", "multi_tool"),
+            ("Why is revenue declining?", "multi_tool"),
+        ],
+    )
+    def test_select_agent_mode(self, query, expected):
+        """クエリ内容に応じたモード選択"""
+        assert select_agent_mode(query) == expected
 
 
 class TestIsChartRequest:
     """Tests for is_chart_request() — chart keyword detection."""
 
-    def test_japanese_chart_keywords(self):
-        """日本語チャートキーワード検出"""
-        from chat import is_chart_request
-
-        assert is_chart_request("売上をグラフで見せて") is True
-        assert is_chart_request("チャートを作成して") is True
-        assert is_chart_request("円グラフで表示") is True
-        assert is_chart_request("折れ線グラフで") is True
-
-    def test_english_chart_keywords(self):
-        """英語チャートキーワード検出"""
-        from chat import is_chart_request
-
-        assert is_chart_request("Show me a chart") is True
-        assert is_chart_request("Visualize the data") is True
-        assert is_chart_request("plot a graph") is True
-
-    def test_non_chart_queries(self):
-        """チャート以外のクエリ → False"""
-        from chat import is_chart_request
-
-        assert is_chart_request("売上TOP5を教えて") is False
-        assert is_chart_request("顧客分析をして") is False
-        assert is_chart_request("hello") is False
+    @pytest.mark.parametrize(
+        ("query", "expected"),
+        [
+            # 日本語チャートキーワード検出
+            ("売上をグラフで見せて", True),
+            ("チャートを作成して", True),
+            ("円グラフで表示", True),
+            ("折れ線グラフで", True),
+            # 英語チャートキーワード検出
+            ("Show me a chart", True),
+            ("Visualize the data", True),
+            ("plot a graph", True),
+            # チャート以外のクエリ → False
+            ("売上TOP5を教えて", False),
+            ("顧客分析をして", False),
+            ("hello", False),
+        ],
+    )
+    def test_is_chart_request(self, query, expected):
+        """チャートキーワードの有無を判定"""
+        assert is_chart_request(query) is expected
 
 
 class TestGetDemoResponse:
@@ -138,8 +134,6 @@ class TestGetDemoResponse:
 
     def test_basic_demo_response(self):
         """通常クエリの DEMO レスポンス"""
-        from chat import get_demo_response
-
         text, events, reasoning = get_demo_response("売上を教えて")
         assert "トップ3" in text or "Adventure" in text
         assert isinstance(events, list)
@@ -147,8 +141,6 @@ class TestGetDemoResponse:
 
     def test_chart_demo_response(self):
         """チャートクエリの DEMO レスポンス → JSON 形式"""
-        from chat import get_demo_response
-
         text, events, reasoning = get_demo_response("売上をグラフで見せて")
         parsed = json.loads(text)
         assert parsed["type"] == "bar"
@@ -157,8 +149,6 @@ class TestGetDemoResponse:
 
     def test_demo_response_returns_tuple(self):
         """戻り値は (str, list, str|None) のタプル"""
-        from chat import get_demo_response
-
         result = get_demo_response("テスト")
         assert isinstance(result, tuple)
         assert len(result) == 3
@@ -171,15 +161,11 @@ class TestBuildQueryWithHistory:
 
     def test_no_history(self):
         """履歴なし → クエリそのまま"""
-        from chat import _build_query_with_history
-
         result = _build_query_with_history("売上は？", [])
         assert result == "売上は？"
 
     def test_with_history(self):
         """履歴あり → フォーマット付きクエリ"""
-        from chat import _build_query_with_history
-
         history = [
             {"role": "user", "content": "こんにちは"},
             {"role": "assistant", "content": "お手伝いします"},
@@ -192,8 +178,6 @@ class TestBuildQueryWithHistory:
 
     def test_with_empty_list(self):
         """空リスト → クエリそのまま"""
-        from chat import _build_query_with_history
-
         result = _build_query_with_history("test", [])
         assert result == "test"
 
@@ -201,59 +185,46 @@ class TestBuildQueryWithHistory:
 class TestContextVarManagement:
     """Tests for ContextVar-based state: reasoning effort, model params, citations."""
 
-    def test_reasoning_effort_default(self):
-        """デフォルト reasoning effort → 'low'"""
-        from chat import get_reasoning_effort
-
-        assert get_reasoning_effort() == "low"
-
-    def test_set_and_get_reasoning_effort(self):
-        """reasoning effort のセットと取得"""
-        from chat import get_reasoning_effort, set_reasoning_effort
-
-        set_reasoning_effort("medium")
-        assert get_reasoning_effort() == "medium"
-        # Restore default
-        set_reasoning_effort("low")
-
-    def test_model_params_default(self):
-        """デフォルト model params"""
-        from chat import get_model_params
-
-        params = get_model_params()
-        assert isinstance(params, dict)
-        assert "model" in params
-        assert "model_reasoning_effort" in params
-        assert "reasoning_summary" in params
-        assert "temperature" in params
-
-    def test_set_and_get_model_params(self):
-        """model params のセットと取得"""
-        from chat import get_model_params, set_model_params
-
-        set_model_params("gpt-5", "high", "detailed", 0.5)
-        params = get_model_params()
-        assert params["model"] == "gpt-5"
-        assert params["model_reasoning_effort"] == "high"
-        assert params["reasoning_summary"] == "detailed"
-        assert params["temperature"] == 0.5
-
-    def test_web_citations_default(self):
-        """デフォルト web citations → 空リスト"""
-        from chat import get_web_citations
-
-        citations = get_web_citations()
-        assert isinstance(citations, list)
-
-    def test_set_and_get_web_citations(self):
-        """web citations のセットと取得"""
-        from chat import get_web_citations, set_web_citations
-
-        test_citations = [{"url": "https://example.com", "title": "Test"}]
-        set_web_citations(test_citations)
-        assert get_web_citations() == test_citations
-        # Cleanup
-        set_web_citations([])
+    def test_context_vars(self):
+        """reasoning effort / model params / web citations のデフォルト・セット・取得"""
+        saved_effort = get_reasoning_effort()
+        saved_params = get_model_params()
+        saved_citations = get_web_citations()
+        try:
+            # デフォルト reasoning effort → 'low'
+            assert saved_effort == "low"
+            set_reasoning_effort("medium")
+            assert get_reasoning_effort() == "medium"
+
+            # デフォルト model params
+            assert isinstance(saved_params, dict)
+            assert {
+                "model",
+                "model_reasoning_effort",
+                "reasoning_summary",
+                "temperature",
+            } <= saved_params.keys()
+            set_model_params("gpt-5", "high", "detailed", 0.5)
+            params = get_model_params()
+            assert params["model"] == "gpt-5"
+            assert params["model_reasoning_effort"] == "high"
+            assert params["reasoning_summary"] == "detailed"
+            assert params["temperature"] == 0.5
+
+            # デフォルト web citations → 空リスト
+            assert isinstance(saved_citations, list)
+            test_citations = [{"url": "https://example.com", "title": "Test"}]
+            set_web_citations(test_citations)
+            assert get_web_citations() == test_citations
+        finally:
+            set_reasoning_effort(saved_effort)
+            set_model_params(
+                saved_params["model"],
+                saved_params["model_reasoning_effort"],
+                saved_params["reasoning_summary"],
+                saved_params["temperature"],
+            )
+            set_web_citations(saved_citations)
 
 
 class TestEndpointURLLogic:
@@ -261,8 +232,6 @@ class TestEndpointURLLogic:
 
     def test_get_openai_endpoint_direct(self, monkeypatch):
         """APIM 未使用時は直接エンドポイントを返す"""
-        import chat
-
         monkeypatch.setattr(chat, "USE_APIM_GATEWAY", False)
         monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "https://direct.openai.azure.com/")
         result = chat.get_openai_endpoint()
@@ -270,8 +239,6 @@ class TestEndpointURLLogic:
 
     def test_get_openai_endpoint_apim(self, monkeypatch):
         """APIM 使用時は Gateway URL を返す"""
-        import chat
-
         monkeypatch.setattr(chat, "USE_APIM_GATEWAY", True)
         monkeypatch.setattr(chat, "APIM_GATEWAY_URL", "https://apim.azure-api.net/openai")
         result = chat.get_openai_endpoint()
@@ -279,8 +246,6 @@ class TestEndpointURLLogic:
 
     def test_get_responses_api_base_url_configured(self, monkeypatch):
         """AZURE_OPENAI_BASE_URL 設定時は正規化された URL を返す"""
-        import chat
-
         monkeypatch.setattr(
             chat, "AZURE_OPENAI_BASE_URL", "https://apim.azure-api.net/foundry-openai/openai/v1"
         )
@@ -290,8 +255,6 @@ class TestEndpointURLLogic:
 
     def test_get_responses_api_base_url_with_trailing_slash(self, monkeypatch):
         """末尾 / 付きの URL"""
-        import chat
-
         monkeypatch.setattr(
             chat, "AZURE_OPENAI_BASE_URL", "https://apim.azure-api.net/foundry-openai/openai/v1/"
         )
@@ -300,8 +263,6 @@ class TestEndpointURLLogic:
 
     def test_get_responses_api_base_url_not_configured(self, monkeypatch):
         """AZURE_OPENAI_BASE_URL 未設定時は None"""
-        import chat
-
         monkeypatch.setattr(chat, "AZURE_OPENAI_BASE_URL", "")
         result = chat.get_responses_api_base_url()
         assert result is None
@@ -312,16 +273,12 @@ class TestBuildReasoningOptions:
 
     def test_non_gpt5_returns_empty(self):
         """GPT-5 以外のモデルでは空 dict"""
-        from chat import _build_reasoning_options, set_model_params
-
         set_model_params("gpt-4o-mini", "", "", 0.7)
         result = _build_reasoning_options()
         assert result == {}
 
     def test_gpt5_with_reasoning(self):
         """GPT-5 + reasoning effort → reasoning dict を含む"""
-        from chat import _build_reasoning_options, set_model_params
-
         set_model_params("gpt-5", "high", "detailed", 0.0)
         result = _build_reasoning_options()
         assert "reasoning" in result
@@ -330,8 +287,6 @@ class TestBuildReasoningOptions:
 
     def test_gpt5_reasoning_summary_off(self):
         """reasoning_summary='off' の場合は summary を含まない"""
-        from chat import _build_reasoning_options, set_model_params
-
         set_model_params("gpt-5", "medium", "off", 0.0)
         result = _build_reasoning_options()
         assert "reasoning" in result
@@ -342,45 +297,41 @@ class TestBuildReasoningOptions:
 class TestChatEndpointValidation:
     """Tests for /chat endpoint input validation."""
 
-    def test_empty_body_returns_error(self, test_client):
-        """空ボディ → 422 または 400 エラー"""
-        response = test_client.post("/api/chat", json={})
-        assert response.status_code in [400, 422]
-
-    def test_missing_messages_returns_error(self, test_client):
-        """messages なし → エラー"""
-        response = test_client.post(
-            "/api/chat",
-            json={"conversation_id": "test-123"},
-        )
-        assert response.status_code in [400, 422]
-
-    def test_empty_messages_returns_error(self, test_client):
-        """空 messages → エラー"""
-        response = test_client.post(
-            "/api/chat",
-            json={"conversation_id": "test-123", "messages": []},
-        )
-        assert response.status_code in [400, 422]
-
-    def test_invalid_conversation_id_format(self, test_client):
-        """不正な UUID → 400"""
-        response = test_client.post(
-            "/api/chat",
-            json={
-                "conversation_id": "not-a-uuid",
-                "messages": [{"role": "user", "content": "hello"}],
-            },
-        )
-        assert response.status_code == 400
-
-    def test_query_too_long(self, test_client):
-        """クエリが長すぎる → 400"""
-        response = test_client.post(
-            "/api/chat",
-            json={
-                "conversation_id": "00000000-0000-0000-0000-000000000000",
-                "messages": [{"role": "user", "content": "x" * 11000}],
-            },
-        )
-        assert response.status_code == 400
+    @pytest.mark.parametrize(
+        ("body", "expected_statuses"),
+        [
+            # 空ボディ → 422 または 400 エラー
+            ({}, {400, 422}),
+            # messages なし → エラー
+            ({"conversation_id": "test-123"}, {400, 422}),
+            # 空 messages → エラー
+            ({"conversation_id": "test-123", "messages": []}, {400, 422}),
+            # 不正な UUID → 400
+            (
+                {
+                    "conversation_id": "not-a-uuid",
+                    "messages": [{"role": "user", "content": "hello"}],
+                },
+                {400},
+            ),
+            # クエリが長すぎる → 400
+            (
+                {
+                    "conversation_id": "00000000-0000-0000-0000-000000000000",
+                    "messages": [{"role": "user", "content": _OVERLONG_QUERY}],
+                },
+                {400},
+            ),
+        ],
+        ids=[
+            "empty_body",
+            "missing_messages",
+            "empty_messages",
+            "invalid_conversation_id",
+            "query_too_long",
+        ],
+    )
+    def test_chat_validation(self, test_client, body, expected_statuses):
+        """不正な入力はエラーステータスを返す"""
+        response = test_client.post("/api/chat", json=body)
+        assert response.status_code in expected_statuses
@@ -32,7 +32,6 @@ class TestConversationOperations:
         parsed = uuid.UUID(conv_id)
         assert str(parsed) == conv_id
 
-    @pytest.mark.asyncio
     async def test_get_conversations_returns_list(self, mock_pyodbc_connection):
         """get_conversations should return a list."""
         mock_pyodbc_connection["cursor"].fetchall.return_value = [
@@ -53,7 +52,6 @@ class TestConversationOperations:
         assert isinstance(result, list)
         assert len(result) == 2
 
-    @pytest.mark.asyncio
     async def test_create_conversation_generates_id(self, mock_pyodbc_connection):
         """create_conversation should generate a new ID."""
         new_id = str(uuid.uuid4())
@@ -161,7 +159,6 @@ class TestErrorHandling:
 class TestGetDbConnectionWithRetry:
     """Tests for get_db_connection_with_retry."""
 
-    @pytest.mark.asyncio
     async def test_success_on_first_attempt(self):
         """Should return connection immediately when first attempt succeeds."""
         from unittest.mock import AsyncMock, patch
@@ -178,7 +175,6 @@ class TestGetDbConnectionWithRetry:
             assert result is mock_conn
             assert mock_get.call_count == 1
 
-    @pytest.mark.asyncio
     async def test_success_on_retry(self):
         """Should retry and succeed on second attempt."""
         from unittest.mock import AsyncMock, patch
@@ -199,7 +195,6 @@ class TestGetDbConnectionWithRetry:
             assert mock_get.call_count == 2
             mock_sleep.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_all_attempts_fail(self):
         """Should return None after all retries exhausted."""
         from unittest.mock import AsyncMock, patch
@@ -218,7 +213,6 @@ class TestGetDbConnectionWithRetry:
             assert result is None
             assert mock_get.call_count == 2
 
-    @pytest.mark.asyncio
     async def test_exponential_backoff_delays(self):
         """Should use exponential backoff delays between retries."""
         from unittest.mock import AsyncMock, patch
@@ -4,43 +4,74 @@ Tests for history_sql.py business logic functions.
 Unlike test_history_sql.py (which tests mock structures), these tests
 validate the *actual* functions in history_sql.py:
 - track_event_if_configured
-- SqlQueryTool (cache, connection, run_sql_query)
+- SqlQueryTool (cache, connection; run_sql_query is in test_sql_query_async.py)
 - generate_fallback_title / _generate_fallback_title_from_message
 - get_conversations, get_conversation_messages (with mocked DB)
 - delete_conversation, rename_conversation (authorization checks)
 """
 
 import json
-from datetime import datetime
-from decimal import Decimal
+import os
+from contextlib import contextmanager
+from types import MappingProxyType
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import history_sql
+import pyodbc
 import pytest
+import utils
 from history_sql import SqlQueryTool, _generate_fallback_title_from_message, generate_fallback_title
 from utils import track_event_if_configured
 
+
+@contextmanager
+def _patched_db(query_result):
+    """Patch the history_sql query helpers; yields (run_query, run_nonquery) mocks."""
+    with (
+        patch(
+            "history_sql.run_query_params", new_callable=AsyncMock, return_value=query_result
+        ) as run_query,
+        patch("history_sql.run_nonquery_params", new_callable=AsyncMock) as run_nonquery,
+    ):
+        yield run_query, run_nonquery
+
+
+def async_return(value):
+    """Return a minimal async stub that ignores its arguments and returns value."""
+
+    async def _stub(*args, **kwargs):
+        return value
+
+    return _stub
+
+
 # ============================================================================
 # track_event_if_configured
 # ============================================================================
 
 
+@patch("utils.track_event")
 class TestTrackEventIfConfigured:
     """Tests for track_event_if_configured."""
 
-    def test_skips_when_not_configured(self, monkeypatch):
+    def test_skips_when_not_configured(self, mock_track_event):
         """Should not call track_event if APPLICATIONINSIGHTS_CONNECTION_STRING is empty."""
-        monkeypatch.setenv("APPLICATIONINSIGHTS_CONNECTION_STRING", "")
-        with patch("utils.track_event") as mock_track:
+        with patch.object(utils, "_APPINSIGHTS_ENABLED", False):
             track_event_if_configured("test_event", {"key": "value"})
-            mock_track.assert_not_called()
+        mock_track_event.assert_not_called()
 
-    def test_calls_track_event_when_configured(self, monkeypatch):
+    def test_calls_track_event_when_configured(self, mock_track_event):
         """Should call track_event when connection string is set."""
-        monkeypatch.setenv("APPLICATIONINSIGHTS_CONNECTION_STRING", "InstrumentationKey=test-key")
-        with patch("utils.track_event") as mock_track:
+        with patch.object(utils, "_APPINSIGHTS_ENABLED", True):
             track_event_if_configured("test_event", {"key": "value"})
-            mock_track.assert_called_once_with("test_event", {"key": "value"})
+        mock_track_event.assert_called_once_with("test_event", {"key": "value"})
+
+    @patch.dict(os.environ, {"APPLICATIONINSIGHTS_CONNECTION_STRING": "InstrumentationKey=k"})
+    def test_refresh_reads_connection_string(self, mock_track_event):
+        """_refresh_appinsights_config should pick up the current environment."""
+        with patch.object(utils, "_APPINSIGHTS_ENABLED", False):
+            utils._refresh_appinsights_config()
+            assert utils._APPINSIGHTS_ENABLED is True
 
 
 # ============================================================================
@@ -48,31 +79,43 @@ class TestTrackEventIfConfigured:
 # ============================================================================
 
 
+_DEFAULT_TITLE = "New Conversation"
+_SHORT_MESSAGE = "Hello World"
+_LONG_MESSAGE = "one two three four five six"
+
+
 class TestGenerateFallbackTitle:
     """Tests for generate_fallback_title."""
 
-    def test_extracts_from_first_user_message(self):
+    @pytest.fixture(scope="module")
+    def messages_with_user(self):
+        """Read-only conversation containing a user turn."""
+        return (
+            MappingProxyType({"role": "system", "content": "You are a helpful assistant."}),
+            MappingProxyType({"role": "user", "content": "売上 TOP5 を教えてください"}),
+            MappingProxyType({"role": "assistant", "content": "こちらが売上TOP5です..."}),
+        )
+
+    @pytest.fixture(scope="module")
+    def messages_without_user(self):
+        """Read-only conversation with no user turn."""
+        return (
+            MappingProxyType({"role": "system", "content": "System prompt"}),
+            MappingProxyType({"role": "assistant", "content": "Hello"}),
+        )
+
+    def test_extracts_from_first_user_message(self, messages_with_user):
         """Should use first user message to generate title."""
-        messages = [
-            {"role": "system", "content": "You are a helpful assistant."},
-            {"role": "user", "content": "売上 TOP5 を教えてください"},
-            {"role": "assistant", "content": "こちらが売上TOP5です..."},
-        ]
-        title = generate_fallback_title(messages)
+        title = generate_fallback_title(messages_with_user)
         assert "売上" in title
 
-    def test_returns_default_when_no_user_messages(self):
+    def test_returns_default_when_no_user_messages(self, messages_without_user):
         """Should return 'New Conversation' when there are no user messages."""
-        messages = [
-            {"role": "system", "content": "System prompt"},
-            {"role": "assistant", "content": "Hello"},
-        ]
-        title = generate_fallback_title(messages)
-        assert title == "New Conversation"
+        assert generate_fallback_title(messages_without_user) == _DEFAULT_TITLE
 
     def test_empty_messages_returns_default(self):
         """Should return 'New Conversation' for empty list."""
-        assert generate_fallback_title([]) == "New Conversation"
+        assert generate_fallback_title([]) == _DEFAULT_TITLE
 
 
 class TestGenerateFallbackTitleFromMessage:
@@ -80,35 +123,30 @@ class TestGenerateFallbackTitleFromMessage:
 
     def test_short_message_used_fully(self):
         """Short message (≤4 words) should be used as-is."""
-        result = _generate_fallback_title_from_message("Hello World")
-        assert result == "Hello World"
+        assert _generate_fallback_title_from_message(_SHORT_MESSAGE) == _SHORT_MESSAGE
 
     def test_long_message_truncated_to_4_words(self):
         """Long message should be truncated to first 4 words."""
-        result = _generate_fallback_title_from_message("one two three four five six")
+        result = _generate_fallback_title_from_message(_LONG_MESSAGE)
         assert result == "one two three four"
 
     def test_empty_string_returns_default(self):
         """Empty string should return default title."""
-        result = _generate_fallback_title_from_message("")
-        assert result == "New Conversation"
+        assert _generate_fallback_title_from_message("") == _DEFAULT_TITLE
 
     def test_none_returns_default(self):
         """None should return default title."""
-        result = _generate_fallback_title_from_message(None)
-        assert result == "New Conversation"
+        assert _generate_fallback_title_from_message(None) == _DEFAULT_TITLE
 
     def test_dict_content_converted_to_string(self):
         """Dict content should be stringified."""
+        # str() of a one-key dict is deterministic and only two words long
         result = _generate_fallback_title_from_message({"text": "hello"})
-        # Should produce something (not crash)
-        assert isinstance(result, str)
-        assert result != "New Conversation"
+        assert result == "{'text': 'hello'}"
 
     def test_whitespace_only_returns_default(self):
         """Whitespace-only string should return default title."""
-        result = _generate_fallback_title_from_message("   ")
-        assert result == "New Conversation"
+        assert _generate_fallback_title_from_message("   ") == _DEFAULT_TITLE
 
 
 # ============================================================================
@@ -121,7 +159,7 @@ class TestSqlQueryTool:
 
     def test_create_with_connection_caches(self):
         """Connection should be stored in global cache."""
-        mock_conn = MagicMock()
+        mock_conn = MagicMock(spec=pyodbc.Connection)
         tool = SqlQueryTool.create_with_connection(mock_conn)
         assert tool.connection_id != ""
         assert tool.get_connection() is mock_conn
@@ -133,7 +171,7 @@ class TestSqlQueryTool:
 
     def test_close_connection_removes_from_cache(self):
         """close_connection should remove from cache and close."""
-        mock_conn = MagicMock()
+        mock_conn = MagicMock(spec=pyodbc.Connection)
         tool = SqlQueryTool.create_with_connection(mock_conn)
         tool.close_connection()
         assert tool.get_connection() is None
@@ -144,81 +182,6 @@ class TestSqlQueryTool:
         tool = SqlQueryTool(connection_id="nonexistent-id")
         tool.close_connection()  # Should not raise
 
-    @pytest.mark.asyncio
-    async def test_run_sql_query_success(self):
-        """Should return JSON list of rows for successful query."""
-        mock_cursor = MagicMock()
-        mock_cursor.description = [("id",), ("name",)]
-        mock_cursor.fetchall.return_value = [(1, "Alice"), (2, "Bob")]
-
-        mock_conn = MagicMock()
-        mock_conn.cursor.return_value = mock_cursor
-
-        tool = SqlQueryTool.create_with_connection(mock_conn)
-        result = await tool.run_sql_query("SELECT id, name FROM users")
-        data = json.loads(result)
-        assert len(data) == 2
-        assert data[0]["name"] == "Alice"
-        # Cleanup
-        tool.close_connection()
-
-    @pytest.mark.asyncio
-    async def test_run_sql_query_no_connection(self):
-        """Should return error when connection is not available."""
-        tool = SqlQueryTool(connection_id="missing")
-        result = await tool.run_sql_query("SELECT 1")
-        data = json.loads(result)
-        assert "error" in data
-
-    @pytest.mark.asyncio
-    async def test_run_sql_query_handles_datetime(self):
-        """datetime values should be converted to ISO format."""
-        mock_cursor = MagicMock()
-        mock_cursor.description = [("created_at",)]
-        dt = datetime(2026, 2, 7, 10, 30, 0)
-        mock_cursor.fetchall.return_value = [(dt,)]
-
-        mock_conn = MagicMock()
-        mock_conn.cursor.return_value = mock_cursor
-
-        tool = SqlQueryTool.create_with_connection(mock_conn)
-        result = await tool.run_sql_query("SELECT created_at FROM t")
-        data = json.loads(result)
-        assert data[0]["created_at"] == "2026-02-07T10:30:00"
-        tool.close_connection()
-
-    @pytest.mark.asyncio
-    async def test_run_sql_query_handles_decimal(self):
-        """Decimal values should be converted to float."""
-        mock_cursor = MagicMock()
-        mock_cursor.description = [("amount",)]
-        mock_cursor.fetchall.return_value = [(Decimal("123.45"),)]
-
-        mock_conn = MagicMock()
-        mock_conn.cursor.return_value = mock_cursor
-
-        tool = SqlQueryTool.create_with_connection(mock_conn)
-        result = await tool.run_sql_query("SELECT amount FROM t")
-        data = json.loads(result)
-        assert data[0]["amount"] == 123.45
-        tool.close_connection()
-
-    @pytest.mark.asyncio
-    async def test_run_sql_query_error_returns_json(self):
-        """Query errors should return error JSON, not raise."""
-        mock_cursor = MagicMock()
-        mock_cursor.execute.side_effect = Exception("Table not found")
-
-        mock_conn = MagicMock()
-        mock_conn.cursor.return_value = mock_cursor
-
-        tool = SqlQueryTool.create_with_connection(mock_conn)
-        result = await tool.run_sql_query("SELECT * FROM nonexistent")
-        data = json.loads(result)
-        assert "error" in data
-        assert "Table not found" in data["error"]
-        tool.close_connection()
-
 
 # ============================================================================
 # get_conversations (with mocked DB layer)
@@ -228,8 +191,7 @@ class TestSqlQueryTool:
 class TestGetConversations:
     """Tests for get_conversations function."""
 
-    @pytest.mark.asyncio
-    async def test_returns_conversations_for_user(self):
+    async def test_returns_conversations_for_user(self, monkeypatch):
         """Should return list of conversations for a user."""
         mock_result = [
             {
@@ -239,14 +201,11 @@ class TestGetConversations:
                 "updatedAt": "2026-01-02",
             },
         ]
-        with patch(
-            "history_sql.run_query_params", new_callable=AsyncMock, return_value=mock_result
-        ):
-            result = await history_sql.get_conversations("user-1", limit=10)
-            assert len(result) == 1
-            assert result[0]["conversation_id"] == "c1"
+        monkeypatch.setattr("history_sql.run_query_params", async_return(mock_result))
+        result = await history_sql.get_conversations("user-1", limit=10)
+        assert len(result) == 1
+        assert result[0]["conversation_id"] == "c1"
 
-    @pytest.mark.asyncio
     async def test_returns_all_conversations_without_user(self):
         """Without user_id, should query without user filter."""
         with patch(
@@ -267,14 +226,12 @@ class TestGetConversations:
 class TestGetConversationMessages:
     """Tests for get_conversation_messages citation processing."""
 
-    @pytest.mark.asyncio
     async def test_returns_none_without_conversation_id(self):
         """Should return None if conversation_id is empty."""
         result = await history_sql.get_conversation_messages("user-1", "")
         assert result is None
 
-    @pytest.mark.asyncio
-    async def test_deserializes_citations_json(self):
+    async def test_deserializes_citations_json(self, monkeypatch):
         """Citations stored as JSON string should be deserialized."""
         citations_json = json.dumps([{"url": "https://example.com", "title": "Test"}])
         mock_result = [
@@ -285,27 +242,21 @@ class TestGetConversationMessages:
                 "feedback": None,
             },
         ]
-        with patch(
-            "history_sql.run_query_params", new_callable=AsyncMock, return_value=mock_result
-        ):
-            result = await history_sql.get_conversation_messages("user-1", "conv-1")
-            assert isinstance(result[0]["citations"], list)
-            assert result[0]["citations"][0]["url"] == "https://example.com"
-
-    @pytest.mark.asyncio
-    async def test_empty_citations_becomes_empty_list(self):
+        monkeypatch.setattr("history_sql.run_query_params", async_return(mock_result))
+        result = await history_sql.get_conversation_messages("user-1", "conv-1")
+        assert isinstance(result[0]["citations"], list)
+        assert result[0]["citations"][0]["url"] == "https://example.com"
+
+    async def test_empty_citations_becomes_empty_list(self, monkeypatch):
         """Empty/null citations should become empty list."""
         mock_result = [
             {"role": "user", "content": "Hello", "citations": None, "feedback": None},
         ]
-        with patch(
-            "history_sql.run_query_params", new_callable=AsyncMock, return_value=mock_result
-        ):
-            result = await history_sql.get_conversation_messages("user-1", "conv-1")
-            assert result[0]["citations"] == []
+        monkeypatch.setattr("history_sql.run_query_params", async_return(mock_result))
+        result = await history_sql.get_conversation_messages("user-1", "conv-1")
+        assert result[0]["citations"] == []
 
-    @pytest.mark.asyncio
-    async def test_invalid_citations_json_becomes_empty_list(self):
+    async def test_invalid_citations_json_becomes_empty_list(self, monkeypatch):
         """Invalid JSON in citations should fallback to empty list."""
         mock_result = [
             {
@@ -315,56 +266,44 @@ class TestGetConversationMessages:
                 "feedback": None,
             },
         ]
-        with patch(
-            "history_sql.run_query_params", new_callable=AsyncMock, return_value=mock_result
-        ):
-            result = await history_sql.get_conversation_messages("user-1", "conv-1")
-            assert result[0]["citations"] == []
+        monkeypatch.setattr("history_sql.run_query_params", async_return(mock_result))
+        result = await history_sql.get_conversation_messages("user-1", "conv-1")
+        assert result[0]["citations"] == []
 
 
 # ============================================================================
 # delete_conversation (authorization checks)
 # ============================================================================
 
+# Ownership lookups that must make delete/rename bail out: no such
+# conversation, or a conversation that belongs to someone else.
+AUTH_FAILURE_CASES = pytest.mark.parametrize(
+    "query_result",
+    [[], [{"userId": "other-user", "conversation_id": "conv-1"}]],
+    ids=["not_found", "not_authorized"],
+)
+
+_OWNED_CONVERSATION = [{"userId": "user-1", "conversation_id": "conv-1"}]
+
 
 class TestDeleteConversation:
     """Tests for delete_conversation authorization and flow."""
 
-    @pytest.mark.asyncio
     async def test_returns_false_without_conversation_id(self):
         """Should return False when conversation_id is empty."""
         result = await history_sql.delete_conversation("user-1", "")
         assert result is False
 
-    @pytest.mark.asyncio
-    async def test_returns_false_when_conversation_not_found(self):
-        """Should return False when conversation doesn't exist."""
-        with patch("history_sql.run_query_params", new_callable=AsyncMock, return_value=[]):
-            result = await history_sql.delete_conversation("user-1", "nonexistent")
-            assert result is False
-
-    @pytest.mark.asyncio
-    async def test_returns_false_when_user_not_authorized(self):
-        """Should return False when user doesn't own the conversation."""
-        with patch(
-            "history_sql.run_query_params",
-            new_callable=AsyncMock,
-            return_value=[{"userId": "other-user", "conversation_id": "conv-1"}],
-        ):
-            result = await history_sql.delete_conversation("user-1", "conv-1")
-            assert result is False
+    @AUTH_FAILURE_CASES
+    async def test_returns_false_on_auth_failure(self, monkeypatch, query_result):
+        """Should return False when the conversation is missing or owned by another user."""
+        monkeypatch.setattr("history_sql.run_query_params", async_return(query_result))
+        result = await history_sql.delete_conversation("user-1", "conv-1")
+        assert result is False
 
-    @pytest.mark.asyncio
     async def test_deletes_messages_and_conversation(self):
         """Should delete messages first, then conversation, and return True."""
-        with (
-            patch(
-                "history_sql.run_query_params",
-                new_callable=AsyncMock,
-                return_value=[{"userId": "user-1", "conversation_id": "conv-1"}],
-            ),
-            patch("history_sql.run_nonquery_params", new_callable=AsyncMock) as mock_nonquery,
-        ):
+        with _patched_db(_OWNED_CONVERSATION) as (_, mock_nonquery):
             result = await history_sql.delete_conversation("user-1", "conv-1")
             assert result is True
             # Should be called twice: once for messages, once for conversation
@@ -379,51 +318,30 @@ class TestDeleteConversation:
 class TestRenameConversation:
     """Tests for rename_conversation validation and authorization."""
 
-    @pytest.mark.asyncio
     async def test_raises_on_empty_conversation_id(self):
         """Should raise ValueError when conversation_id is empty."""
         # The function catches the ValueError and returns False
         result = await history_sql.rename_conversation("user-1", "", "New Title")
         assert result is False
 
-    @pytest.mark.asyncio
     async def test_returns_false_when_title_is_none(self):
         """Should return False when title is None."""
         result = await history_sql.rename_conversation("user-1", "conv-1", None)
         assert result is False
 
-    @pytest.mark.asyncio
-    async def test_returns_false_when_conversation_not_found(self):
-        """Should return False when conversation doesn't exist."""
-        with patch("history_sql.run_query_params", new_callable=AsyncMock, return_value=[]):
-            result = await history_sql.rename_conversation("user-1", "conv-1", "Title")
-            assert result is False
+    @AUTH_FAILURE_CASES
+    async def test_returns_false_on_auth_failure(self, monkeypatch, query_result):
+        """Should return False when the conversation is missing or owned by another user."""
+        monkeypatch.setattr("history_sql.run_query_params", async_return(query_result))
+        result = await history_sql.rename_conversation("user-1", "conv-1", "Title")
+        assert result is False
 
-    @pytest.mark.asyncio
-    async def test_returns_false_when_user_not_authorized(self):
-        """Should return False when user doesn't own the conversation."""
-        with patch(
-            "history_sql.run_query_params",
-            new_callable=AsyncMock,
-            return_value=[{"userId": "other-user", "conversation_id": "conv-1"}],
-        ):
-            result = await history_sql.rename_conversation("user-1", "conv-1", "Title")
-            assert result is False
-
-    @pytest.mark.asyncio
     async def test_renames_successfully(self):
         """Should update title and return True for authorized user."""
-        with (
-            patch(
-                "history_sql.run_query_params",
-                new_callable=AsyncMock,
-                return_value=[{"userId": "user-1", "conversation_id": "conv-1"}],
-            ),
-            patch("history_sql.run_nonquery_params", new_callable=AsyncMock) as mock_nonquery,
-        ):
+        with _patched_db(_OWNED_CONVERSATION) as (_, mock_nonquery):
             result = await history_sql.rename_conversation("user-1", "conv-1", "New Title")
             assert result is True
-            mock_nonquery.assert_called_once()
-            # Verify the title was passed
-            call_args = mock_nonquery.call_args
-            assert "New Title" in call_args[0][1]
+            mock_nonquery.assert_called_once_with(
+                "UPDATE hst_conversations SET title = ? WHERE userId = ?  and conversation_id = ?",
+                ("New Title", "user-1", "conv-1"),
+            )
@@ -4,75 +4,84 @@ Tests for MCP Client
 Unit tests for the MCP client that connects to the Azure Functions MCP server.
 """
 
-import json
-from unittest.mock import AsyncMock, patch
+from unittest.mock import patch
 
+import httpx
 import pytest
-from mcp_client import MCP_ENABLED, call_mcp_tool, get_mcp_tools
+from mcp_client import (
+    MCP_ENABLED,
+    calculate_rfm_score,
+    calculate_yoy_growth,
+    call_mcp_tool,
+    get_mcp_tools,
+    identify_slow_moving_inventory,
+)
 
+from tests._helpers import loads
 
-def create_mock_response(json_data: dict) -> AsyncMock:
-    """Create a mock httpx response with proper async support."""
-    mock_response = AsyncMock()
-    # httpx Response.json() is synchronous, not async
-    mock_response.json = lambda: json_data
-    # raise_for_status() is also synchronous
-    mock_response.raise_for_status = lambda: None
-    return mock_response
+
+@pytest.fixture(scope="module")
+async def _mcp_transport():
+    """Build one httpx.AsyncClient on a MockTransport whose handler tests can swap."""
+    state = {"handler": None}
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda r: state["handler"](r)))
+    yield state, client
+    await client.aclose()
+
+
+@pytest.fixture
+def mcp_client_factory(_mcp_transport):
+    """
+    Route call_mcp_tool through the shared MockTransport client.
+
+    Call the returned factory with the JSON-RPC payload to answer with, or
+    with ``error=`` to raise an exception from the transport instead.
+    """
+    state, client = _mcp_transport
+
+    def _factory(json_data: dict | None = None, error: Exception | None = None):
+        def _handler(request: httpx.Request) -> httpx.Response:
+            if error is not None:
+                raise error
+            return httpx.Response(200, json=json_data)
+
+        state["handler"] = _handler
+        return client
+
+    with patch("mcp_client._get_httpx_client", return_value=client):
+        yield _factory
 
 
 class TestMCPClient:
     """Tests for MCP client functions."""
 
-    @pytest.mark.asyncio
-    async def test_call_mcp_tool_success(self):
+    async def test_call_mcp_tool_success(self, mcp_client_factory):
         """call_mcp_tool should return tool result on success."""
-        mock_response = create_mock_response(
+        mcp_client_factory(
             {
                 "jsonrpc": "2.0",
                 "id": 1,
                 "result": {"content": [{"type": "text", "text": '{"result": "success"}'}]},
             }
         )
+        result = await call_mcp_tool("test_tool", {"arg": "value"})
+        assert result == '{"result": "success"}'
 
-        mock_client = AsyncMock()
-        mock_client.post.return_value = mock_response
-        mock_client.is_closed = False
-
-        with patch("mcp_client._get_httpx_client", return_value=mock_client):
-            result = await call_mcp_tool("test_tool", {"arg": "value"})
-            assert result == '{"result": "success"}'
-
-    @pytest.mark.asyncio
-    async def test_call_mcp_tool_error(self):
+    async def test_call_mcp_tool_error(self, mcp_client_factory):
         """call_mcp_tool should handle errors gracefully."""
-        mock_response = create_mock_response(
+        mcp_client_factory(
             {"jsonrpc": "2.0", "id": 1, "error": {"code": -32601, "message": "Method not found"}}
         )
+        result = await call_mcp_tool("unknown_tool", {})
+        assert '"error"' in result
 
-        mock_client = AsyncMock()
-        mock_client.post.return_value = mock_response
-        mock_client.is_closed = False
-
-        with patch("mcp_client._get_httpx_client", return_value=mock_client):
-            result = await call_mcp_tool("unknown_tool", {})
-            result_dict = json.loads(result)
-            assert "error" in result_dict
-
-    @pytest.mark.asyncio
-    async def test_call_mcp_tool_timeout(self):
+    async def test_call_mcp_tool_timeout(self, mcp_client_factory):
         """call_mcp_tool should handle timeout."""
-        import httpx
-
-        mock_client = AsyncMock()
-        mock_client.post.side_effect = httpx.TimeoutException("Timeout")
-        mock_client.is_closed = False
-
-        with patch("mcp_client._get_httpx_client", return_value=mock_client):
-            result = await call_mcp_tool("test_tool", {})
-            result_dict = json.loads(result)
-            assert "error" in result_dict
-            assert "timeout" in result_dict["error"].lower()
+        mcp_client_factory(error=httpx.TimeoutException("Timeout"))
+        result = await call_mcp_tool("test_tool", {})
+        result_dict = loads(result)
+        assert "error" in result_dict
+        assert "timeout" in result_dict["error"].lower()
 
     def test_get_mcp_tools_returns_list(self):
         """get_mcp_tools should return a list of tool functions."""
@@ -93,11 +102,8 @@ class TestMCPClient:
 class TestMCPToolWrappers:
     """Tests for individual MCP tool wrappers."""
 
-    @pytest.mark.asyncio
     async def test_calculate_yoy_growth_wrapper(self):
         """calculate_yoy_growth wrapper should call MCP server."""
-        from mcp_client import calculate_yoy_growth
-
         # Directly mock call_mcp_tool to avoid httpx complexity
         with patch("mcp_client.call_mcp_tool") as mock_call:
             mock_call.return_value = '{"growth_rate_percent": 20.0}'
@@ -106,33 +112,25 @@ class TestMCPToolWrappers:
             assert result == '{"growth_rate_percent": 20.0}'
 
             # Verify the correct tool was called
-            mock_call.assert_called_once()
-            args, kwargs = mock_call.call_args
-            assert args[0] == "calculate_yoy_growth"
-            assert args[1]["current_value"] == 120000
-            assert args[1]["previous_value"] == 100000
+            mock_call.assert_called_once_with(
+                "calculate_yoy_growth", {"current_value": 120000, "previous_value": 100000}
+            )
 
-    @pytest.mark.asyncio
     async def test_calculate_rfm_score_wrapper(self):
         """calculate_rfm_score wrapper should call MCP server."""
-        from mcp_client import calculate_rfm_score
-
         with patch("mcp_client.call_mcp_tool") as mock_call:
             mock_call.return_value = '{"rfm_scores": {"recency": 5}}'
 
             result = await calculate_rfm_score(5, 10, 200000)
-            assert "rfm_scores" in result
+            assert result == '{"rfm_scores": {"recency": 5}}'
 
             # Verify the correct tool was called
-            mock_call.assert_called_once()
-            args, _ = mock_call.call_args
-            assert args[0] == "calculate_rfm_score"
+            mock_call.assert_called_once_with(
+                "calculate_rfm_score", {"recency_days": 5, "frequency": 10, "monetary": 200000}
+            )
 
-    @pytest.mark.asyncio
     async def test_identify_slow_moving_inventory_wrapper(self):
         """identify_slow_moving_inventory wrapper should call MCP server."""
-        from mcp_client import identify_slow_moving_inventory
-
         with patch("mcp_client.call_mcp_tool") as mock_call:
             mock_call.return_value = '{"summary": {"dead_stock_count": 1}}'
 
@@ -146,9 +144,10 @@ class TestMCPToolWrappers:
                 }
             ]
             result = await identify_slow_moving_inventory(items)
-            assert "summary" in result
+            assert result == '{"summary": {"dead_stock_count": 1}}'
 
             # Verify the correct tool was called
-            mock_call.assert_called_once()
-            args, _ = mock_call.call_args
-            assert args[0] == "identify_slow_moving_inventory"
+            mock_call.assert_called_once_with(
+                "identify_slow_moving_inventory",
+                {"inventory_items": items, "slow_moving_threshold_days": 90},
+            )
@@ -0,0 +1,177 @@
+"""
+Async run_sql_query tests for SqlQueryTool (history_sql.py) and
+SqlAgentHandler (agents/sql_agent.py).
+
+These live apart from the synchronous unit tests so that pytest-xdist
+(``--dist=loadfile``) can schedule them on their own worker.
+
+Covers:
+- SQL query execution with type conversion
+- Error handling (no connection, query failure)
+- Cursor cleanup and non-ASCII output
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from agents.sql_agent import SqlAgentHandler
+from history_sql import SqlQueryTool
+
+from tests._helpers import loads
+
+
+# ============================================================================
+# SqlQueryTool.run_sql_query
+# ============================================================================
+
+
+@pytest.fixture
+def sql_tool_factory(sql_connection_factory):
+    """Build a SqlQueryTool on the shared mock connection; closes it on teardown."""
+    tools = []
+
+    def _factory(columns=(), rows=(), execute_error=None):
+        conn, cursor = sql_connection_factory(columns, rows, execute_error)
+        tool = SqlQueryTool.create_with_connection(conn)
+        tools.append(tool)
+        return tool, cursor
+
+    yield _factory
+    for tool in tools:
+        tool.close_connection()
+
+
+class TestSqlQueryToolRunQuery:
+    """Tests for SqlQueryTool.run_sql_query."""
+
+    async def test_run_sql_query_success(self, sql_tool_factory):
+        """Should return JSON list of rows for successful query."""
+        tool, _ = sql_tool_factory(["id", "name"], [(1, "Alice"), (2, "Bob")])
+        result = await tool.run_sql_query("SELECT id, name FROM users")
+        data = loads(result)
+        assert len(data) == 2
+        assert data[0]["name"] == "Alice"
+
+    async def test_run_sql_query_no_connection(self):
+        """Should return error when connection is not available."""
+        tool = SqlQueryTool(connection_id="missing")
+        result = await tool.run_sql_query("SELECT 1")
+        assert '"error"' in result
+
+    @pytest.mark.parametrize(
+        ("column", "value", "expected"),
+        [
+            # datetime values should be converted to ISO format
+            ("created_at", datetime(2026, 2, 7, 10, 30, 0), "2026-02-07T10:30:00"),
+            # Decimal values should be converted to float
+            ("amount", Decimal("123.45"), 123.45),
+        ],
+        ids=["datetime", "decimal"],
+    )
+    async def test_run_sql_query_converts_types(self, sql_tool_factory, column, value, expected):
+        """Non-JSON-native column values should be converted before serialization."""
+        tool, _ = sql_tool_factory([column], [(value,)])
+        result = await tool.run_sql_query(f"SELECT {column} FROM t")
+        data = loads(result)
+        assert data[0][column] == expected
+
+    async def test_run_sql_query_error_returns_json(self, sql_tool_factory):
+        """Query errors should return error JSON, not raise."""
+        tool, _ = sql_tool_factory(execute_error=Exception("Table not found"))
+        result = await tool.run_sql_query("SELECT * FROM nonexistent")
+        data = loads(result)
+        assert "error" in data
+        assert "Table not found" in data["error"]
+
+
+# ============================================================================
+# SqlAgentHandler.run_sql_query
+# ============================================================================
+
+
+@pytest.fixture
+def sql_handler_factory(sql_connection_factory):
+    """Build a SqlAgentHandler on the shared mock connection."""
+
+    def _factory(columns=(), rows=(), execute_error=None):
+        conn, cursor = sql_connection_factory(columns, rows, execute_error)
+        return SqlAgentHandler(conn), cursor
+
+    return _factory
+
+
+class TestSqlAgentRunQuery:
+    """Tests for SqlAgentHandler.run_sql_query."""
+
+    async def test_returns_error_when_no_connection(self):
+        """Should return error JSON when connection is None."""
+        handler = SqlAgentHandler(None)
+        result = await handler.run_sql_query("SELECT 1")
+        data = loads(result)
+        assert "error" in data
+        assert "not available" in data["error"]
+
+    async def test_basic_query_returns_json(self, sql_handler_factory):
+        """Should return list of row dicts for a normal query."""
+        handler, _ = sql_handler_factory(["id", "name"], [(1, "Alice"), (2, "Bob")])
+        result = await handler.run_sql_query("SELECT id, name FROM users")
+        data = loads(result)
+
+        assert len(data) == 2
+        assert data[0] == {"id": 1, "name": "Alice"}
+        assert data[1] == {"id": 2, "name": "Bob"}
+
+    async def test_empty_result_set(self, sql_handler_factory):
+        """Should return empty list for query with no rows."""
+        handler, _ = sql_handler_factory(["id"], [])
+        result = await handler.run_sql_query("SELECT id FROM empty_table")
+        data = loads(result)
+        assert data == []
+
+    @pytest.mark.parametrize(
+        ("column", "value", "expected"),
+        [
+            # NULL values should be preserved as None/null in JSON
+            ("value", None, None),
+            # Non-primitive types (e.g., Decimal, bytes) should be str-converted
+            ("amount", Decimal("99.99"), "99.99"),
+            ("data", b"\x00\x01", str(b"\x00\x01")),
+        ],
+        ids=["none", "decimal", "bytes"],
+    )
+    async def test_value_conversion(self, sql_handler_factory, column, value, expected):
+        """Column values should be preserved or str-converted for JSON output."""
+        handler, _ = sql_handler_factory(["id", column], [(1, value)])
+        result = await handler.run_sql_query(f"SELECT id, {column} FROM t")
+        data = loads(result)
+        assert data[0][column] == expected
+
+    async def test_query_execution_error_returns_error_json(self, sql_handler_factory):
+        """Non-SELECT queries should return error JSON."""
+        handler, _ = sql_handler_factory()
+        result = await handler.run_sql_query("SELEC 1")
+        data = loads(result)
+        assert "error" in data
+        assert "SELECT" in data["error"]
+
+    async def test_query_syntax_error_returns_error_json(self, sql_handler_factory):
+        """Query execution failures should return error JSON, not raise."""
+        handler, _ = sql_handler_factory(execute_error=Exception("Syntax error near 'FROM'"))
+        result = await handler.run_sql_query("SELECT * FORM t")
+        data = loads(result)
+        assert "error" in data
+        assert "Syntax error" in data["error"]
+
+    async def test_cursor_closed_after_query(self, sql_handler_factory):
+        """Cursor should be closed after successful query."""
+        handler, cursor = sql_handler_factory(["x"], [(1,)])
+        await handler.run_sql_query("SELECT 1 AS x")
+        cursor.close.assert_called_once()
+
+    async def test_japanese_content_preserved(self, sql_handler_factory):
+        """Japanese characters should be preserved (ensure_ascii=False)."""
+        handler, _ = sql_handler_factory(["商品名"], [("テスト商品",)])
+        result = await handler.run_sql_query("SELECT 商品名 FROM products")
+        # Raw comparison: escaped output would read "\\u30c6..." instead
+        assert result == '[{"商品名": "テスト商品"}]'
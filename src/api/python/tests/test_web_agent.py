@@ -7,8 +7,6 @@ Tests cover configuration, is_configured(), web_search() edge cases
 
 import json
 
-import pytest
-
 
 class TestWebAgentHandlerInit:
     """Tests for WebAgentHandler.__init__() — configuration loading."""
@@ -121,7 +119,6 @@ class TestIsConfigured:
 class TestWebSearch:
     """Tests for web_search() — with mocked external dependencies."""
 
-    @pytest.mark.asyncio
     async def test_unconfigured_returns_fallback(self, monkeypatch):
         """未設定時はfallback JSONを返す"""
         monkeypatch.delenv("AZURE_AI_PROJECT_ENDPOINT", raising=False)
@@ -137,7 +134,6 @@ class TestWebSearch:
         assert data["citations"] == []
         assert "Web検索が設定されていません" in data["answer"]
 
-    @pytest.mark.asyncio
     async def test_unconfigured_includes_query_in_answer(self, monkeypatch):
         """未設定時のfallback にクエリが含まれる"""
         monkeypatch.delenv("AZURE_AI_PROJECT_ENDPOINT", raising=False)
@@ -155,7 +151,6 @@ class TestWebSearch:
 class TestBingGrounding:
     """Tests for bing_grounding() — alias for web_search."""
 
-    @pytest.mark.asyncio
     async def test_bing_grounding_calls_web_search(self, monkeypatch):
         """bing_grounding は web_search のエイリアス"""
         monkeypatch.delenv("AZURE_AI_PROJECT_ENDPOINT", raising=False)
@@ -7,6 +7,18 @@ from azure.monitor.events.extension import track_event
 
 logger = logging.getLogger(__name__)
 
+# Read once: the connection string is fixed for the lifetime of the process
+_APPINSIGHTS_ENABLED = False
+
+
+def _refresh_appinsights_config():
+    """Re-read APPLICATIONINSIGHTS_CONNECTION_STRING from the environment."""
+    global _APPINSIGHTS_ENABLED
+    _APPINSIGHTS_ENABLED = bool(os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING"))
+
+
+_refresh_appinsights_config()
+
 
 def track_event_if_configured(event_name: str, event_data: dict):
     """
@@ -16,6 +28,5 @@ def track_event_if_configured(event_name: str, event_data: dict):
         event_name: The name of the event to track.
         event_data: The data to associate with the event.
     """
-    connection_string = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING")
-    if connection_string:
+    if _APPINSIGHTS_ENABLED:
         track_event(event_name, event_data)
@@ -14,6 +14,10 @@ graceful_timeout = 30
 # Keep-alive timeout for idle connections (seconds)
 keepalive = 5
 
+# Uvicorn workers serve many requests concurrently on one event loop, so the
+# sync-worker (2 * cpu) + 1 rule just oversubscribes; one per core is enough.
+# preload_app stays off: App Insights exporters started at import do not
+# survive the fork into workers.
 num_cpus = multiprocessing.cpu_count()
-workers = (num_cpus * 2) + 1
+workers = max(2, num_cpus)
 worker_class = "uvicorn.workers.UvicornWorker"
@@ -5,12 +5,13 @@ Business Analytics MCP Server for the Agentic AI application.
 Provides tools for sales analysis, product comparison, customer segmentation, and inventory analysis.
 """
 
-import json
+import hashlib
 import logging
 import os
 import time
 
 import azure.functions as func
+import orjson
 from mcp_handler import MCPHandler
 
 # Configure logging
@@ -20,16 +21,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Application Insights setup
-try:
-    from azure.monitor.opentelemetry import configure_azure_monitor
+# Application Insights setup (the exporter import is heavy, so only pay for it
+# on cold start when a connection string is actually configured)
+connection_string = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING")
+if connection_string:
+    try:
+        from azure.monitor.opentelemetry import configure_azure_monitor
 
-    connection_string = os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING")
-    if connection_string:
         configure_azure_monitor(connection_string=connection_string)
         logger.info("Application Insights configured for MCP Function")
-except ImportError:
-    logger.warning("azure-monitor-opentelemetry not installed")
+    except ImportError:
+        logger.warning("azure-monitor-opentelemetry not installed")
 
 # Initialize Function App (FUNCTION auth level - secured by function key + APIM subscription)
 app = func.FunctionApp(http_auth_level=func.AuthLevel.FUNCTION)
@@ -37,6 +39,90 @@ app = func.FunctionApp(http_auth_level=func.AuthLevel.FUNCTION)
 # Initialize MCP Handler
 mcp_handler = MCPHandler()
 
+# Health payload never changes after startup, so encode it once
+_HEALTH_BODY = orjson.dumps(
+    {
+        "status": "healthy",
+        "service": "Business Analytics MCP Server",
+        "version": "1.0.0",
+        "tools_count": mcp_handler.tools_count,
+    }
+)
+_HEALTH_ETAG = f'"{hashlib.blake2b(_HEALTH_BODY, digest_size=8).hexdigest()}"'
+_HEALTH_HEADERS = {"ETag": _HEALTH_ETAG, "Cache-Control": "max-age=5"}
+
+# Parse failures carry no request id, so the whole envelope is static
+_PARSE_ERROR_BODY = orjson.dumps(
+    {
+        "jsonrpc": "2.0",
+        "id": None,
+        "error": {"code": -32700, "message": "Parse error: Invalid JSON"},
+    }
+)
+
+
+def _jsonrpc_error(request_id, code: int, message: str, status_code: int) -> func.HttpResponse:
+    """Build a JSON-RPC error response for the given request id."""
+    return func.HttpResponse(
+        orjson.dumps(
+            {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+        ),
+        status_code=status_code,
+        mimetype="application/json",
+    )
+
+
+def _jsonrpc_result(request_id, result: dict) -> func.HttpResponse:
+    """Build a JSON-RPC success response for the given request id."""
+    return func.HttpResponse(
+        # Tool results can be arbitrary dicts; allow non-string keys rather than failing
+        orjson.dumps(
+            {"jsonrpc": "2.0", "id": request_id, "result": result},
+            option=orjson.OPT_NON_STR_KEYS,
+        ),
+        status_code=200,
+        mimetype="application/json",
+    )
+
+
+async def _handle_tools_list(params: dict, request_id) -> func.HttpResponse:
+    """Handle tools/list."""
+    start_ns = time.monotonic_ns()
+    body = mcp_handler.list_tools_envelope(request_id)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "MCP tools/list completed: tools_count=%d duration_ms=%.3f",
+            mcp_handler.tools_count,
+            (time.monotonic_ns() - start_ns) / 1e6,
+        )
+    return func.HttpResponse(body, status_code=200, mimetype="application/json")
+
+
+async def _handle_tools_call(params: dict, request_id) -> func.HttpResponse:
+    """Handle tools/call."""
+    tool_name = params.get("name")
+    tool_args = params.get("arguments", {})
+
+    if not tool_name:
+        return _jsonrpc_error(request_id, -32602, "Invalid params: tool name is required", 400)
+
+    start_ns = time.monotonic_ns()
+    result = await mcp_handler.call_tool(tool_name, tool_args)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "MCP tools/call completed: tool=%s duration_ms=%.3f",
+            tool_name,
+            (time.monotonic_ns() - start_ns) / 1e6,
+        )
+    return _jsonrpc_result(request_id, result)
+
+
+# JSON-RPC method name -> handler
+_METHOD_HANDLERS = {
+    "tools/list": _handle_tools_list,
+    "tools/call": _handle_tools_call,
+}
+
 
 @app.route(route="mcp", methods=["POST"])
 async def mcp_endpoint(req: func.HttpRequest) -> func.HttpResponse:
@@ -55,122 +141,48 @@ async def mcp_endpoint(req: func.HttpRequest) -> func.HttpResponse:
         "params": { ... }
     }
     """
+    body = None
     try:
         # Parse request body
         try:
-            body = req.get_json()
-        except ValueError:
+            raw_body = req.get_body()
+            body = orjson.loads(raw_body)
+        except orjson.JSONDecodeError:
             return func.HttpResponse(
-                json.dumps(
-                    {
-                        "jsonrpc": "2.0",
-                        "id": None,
-                        "error": {"code": -32700, "message": "Parse error: Invalid JSON"},
-                    }
-                ),
-                status_code=400,
-                mimetype="application/json",
-            )
-
-        # Validate JSON-RPC structure
-        if "method" not in body:
-            return func.HttpResponse(
-                json.dumps(
-                    {
-                        "jsonrpc": "2.0",
-                        "id": body.get("id"),
-                        "error": {"code": -32600, "message": "Invalid Request: method is required"},
-                    }
-                ),
-                status_code=400,
-                mimetype="application/json",
+                _PARSE_ERROR_BODY, status_code=400, mimetype="application/json"
             )
 
         method = body.get("method")
-        params = body.get("params", {})
         request_id = body.get("id", "unknown")
-        start_time = time.time()
 
-        logger.info(f"MCP Request started: method={method}, id={request_id}")
+        # Validate JSON-RPC structure
+        if method is None:
+            return _jsonrpc_error(request_id, -32600, "Invalid Request: method is required", 400)
 
-        # Handle methods
-        if method == "tools/list":
-            result = mcp_handler.list_tools()
-            duration = time.time() - start_time
-            logger.info(
-                f"MCP tools/list completed: tools_count={len(result.get('tools', []))} "
-                f"duration={duration:.3f}s"
-            )
-        elif method == "tools/call":
-            tool_name = params.get("name")
-            tool_args = params.get("arguments", {})
-
-            if not tool_name:
-                return func.HttpResponse(
-                    json.dumps(
-                        {
-                            "jsonrpc": "2.0",
-                            "id": request_id,
-                            "error": {
-                                "code": -32602,
-                                "message": "Invalid params: tool name is required",
-                            },
-                        }
-                    ),
-                    status_code=400,
-                    mimetype="application/json",
-                )
-
-            result = await mcp_handler.call_tool(tool_name, tool_args)
-            duration = time.time() - start_time
-            logger.info(f"MCP tools/call completed: tool={tool_name} duration={duration:.3f}s")
-        else:
-            return func.HttpResponse(
-                json.dumps(
-                    {
-                        "jsonrpc": "2.0",
-                        "id": request_id,
-                        "error": {"code": -32601, "message": f"Method not found: {method}"},
-                    }
-                ),
-                status_code=404,
-                mimetype="application/json",
-            )
+        params = body.get("params") or {}
 
-        # Return success response
-        return func.HttpResponse(
-            json.dumps({"jsonrpc": "2.0", "id": request_id, "result": result}),
-            status_code=200,
-            mimetype="application/json",
+        logger.info(
+            "MCP Request started: method=%s, id=%s, bytes=%d", method, request_id, len(raw_body)
         )
 
+        method_handler = _METHOD_HANDLERS.get(method)
+        if method_handler is None:
+            return _jsonrpc_error(request_id, -32601, f"Method not found: {method}", 404)
+        return await method_handler(params, request_id)
+
     except Exception as e:
-        logger.error(f"MCP Error: {e}", exc_info=True)
-        return func.HttpResponse(
-            json.dumps(
-                {
-                    "jsonrpc": "2.0",
-                    "id": body.get("id") if "body" in dir() else None,
-                    "error": {"code": -32603, "message": f"Internal error: {str(e)}"},
-                }
-            ),
-            status_code=500,
-            mimetype="application/json",
-        )
+        logger.error("MCP Error: %s", e, exc_info=True)
+        # body may be unset (or not an object) if the failure happened early
+        request_id = body.get("id") if isinstance(body, dict) else None
+        return _jsonrpc_error(request_id, -32603, f"Internal error: {str(e)}", 500)
 
 
 @app.route(route="health", methods=["GET"])
 def health_check(req: func.HttpRequest) -> func.HttpResponse:
     """Health check endpoint."""
+    # Probes that echo the ETag get a body-less 304
+    if req.headers.get("If-None-Match") == _HEALTH_ETAG:
+        return func.HttpResponse(status_code=304, headers=_HEALTH_HEADERS)
     return func.HttpResponse(
-        json.dumps(
-            {
-                "status": "healthy",
-                "service": "Business Analytics MCP Server",
-                "version": "1.0.0",
-                "tools_count": len(mcp_handler.list_tools().get("tools", [])),
-            }
-        ),
-        status_code=200,
-        mimetype="application/json",
+        _HEALTH_BODY, status_code=200, mimetype="application/json", headers=_HEALTH_HEADERS
     )
@@ -10,13 +10,18 @@ import sys
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from mcp_handler import MCPHandler
 
-app = FastAPI(title="MCP Server (Local)", version="1.0.0")
+app = FastAPI(
+    title="MCP Server (Local)",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # CORS for local development
 app.add_middleware(
@@ -31,6 +36,25 @@ app.add_middleware(
 handler = MCPHandler()
 
 
+async def _tools_list(params: dict, request_id) -> Response:
+    """Handle tools/list from the handler's pre-encoded catalog."""
+    return Response(handler.list_tools_envelope(request_id), media_type="application/json")
+
+
+async def _tools_call(params: dict, request_id) -> Response:
+    """Handle tools/call."""
+    result = await handler.call_tool(params.get("name", ""), params.get("arguments", {}))
+    # Return the response directly so FastAPI skips jsonable_encoder on large results
+    return ORJSONResponse({"jsonrpc": "2.0", "id": request_id, "result": result})
+
+
+# JSON-RPC method name -> handler
+_METHOD_HANDLERS = {
+    "tools/list": _tools_list,
+    "tools/call": _tools_call,
+}
+
+
 @app.post("/api/mcp")
 async def mcp_endpoint(request: Request):
     """Handle MCP JSON-RPC requests."""
@@ -41,26 +65,23 @@ async def mcp_endpoint(request: Request):
     params = body.get("params", {})
     request_id = body.get("id", 1)
 
-    if method == "tools/list":
-        result = handler.list_tools()
-    elif method == "tools/call":
-        tool_name = params.get("name", "")
-        arguments = params.get("arguments", {})
-        result = await handler.call_tool(tool_name, arguments)
-    else:
-        return {
-            "jsonrpc": "2.0",
-            "id": request_id,
-            "error": {"code": -32601, "message": f"Unknown method: {method}"},
-        }
+    method_handler = _METHOD_HANDLERS.get(method)
+    if method_handler is None:
+        return ORJSONResponse(
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": -32601, "message": f"Unknown method: {method}"},
+            }
+        )
 
-    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+    return await method_handler(params, request_id)
 
 
 @app.get("/api/mcp/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "ok", "tools_count": len(handler._tool_definitions)}
+    return {"status": "ok", "tools_count": handler.tools_count}
 
 
 @app.get("/")
@@ -4,9 +4,14 @@ MCP Protocol Handler
 Handles MCP protocol operations and dispatches tool calls to appropriate handlers.
 """
 
+import asyncio
+import inspect
 import logging
-from typing import Any
+from collections.abc import Callable, Mapping
+from typing import Any, NamedTuple
 
+import fastjsonschema
+import orjson
 from tools.customer_segment import CustomerSegmentTools
 from tools.inventory_analysis import InventoryAnalysisTools
 from tools.product_comparison import ProductComparisonTools
@@ -15,6 +20,50 @@ from tools.sales_analysis import SalesAnalysisTools
 logger = logging.getLogger(__name__)
 
 
+class _ToolEntry(NamedTuple):
+    """A registered tool: bound method plus its call shape, resolved once."""
+
+    method: Callable[..., Any]
+    is_async: bool
+    required_args: frozenset[str]
+    # None when the method takes **kwargs and accepts any argument name
+    accepted_args: frozenset[str] | None
+    # Compiled inputSchema validator; None when the tool publishes no schema
+    validate: Callable[[dict], Any] | None
+
+
+def _build_tool_entry(method: Callable[..., Any], input_schema: dict | None) -> _ToolEntry:
+    """Inspect a bound tool method's signature and compile its input schema."""
+    params = inspect.signature(method).parameters.values()
+    accepts_any = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in params)
+    named = [
+        p
+        for p in params
+        if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    ]
+    return _ToolEntry(
+        method=method,
+        is_async=inspect.iscoroutinefunction(method),
+        required_args=frozenset(p.name for p in named if p.default is inspect.Parameter.empty),
+        accepted_args=None if accepts_any else frozenset(p.name for p in named),
+        # use_default=False: leave defaults to the Python signature, not the schema
+        validate=(
+            fastjsonschema.compile(input_schema, use_default=False) if input_schema else None
+        ),
+    )
+
+
+def _result_text(result: Any) -> str:
+    """Render a tool result as MCP text content, JSON-encoding structured values."""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, bytes):
+        return result.decode()
+    return orjson.dumps(
+        result, default=str, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+    ).decode()
+
+
 class MCPHandler:
     """
     MCP Protocol Handler.
@@ -31,13 +80,19 @@ class MCPHandler:
         self.inventory_tools = InventoryAnalysisTools()
 
         # Build tool registry
-        self._tool_registry: dict[str, tuple[Any, callable]] = {}
-        self._tool_definitions: list[dict] = []
+        self._tool_registry: dict[str, _ToolEntry] = {}
+        tool_definitions: list[dict] = []
 
-        self._register_tools()
+        self._register_tools(tool_definitions)
 
-    def _register_tools(self):
-        """Register all tools from all modules."""
+        # The catalog is fixed after registration; freeze it and build the response once
+        self._tool_definitions: tuple[dict, ...] = tuple(tool_definitions)
+        self.tools_count = len(self._tool_definitions)
+        self._list_tools_response = {"tools": self._tool_definitions}
+        self._list_tools_json = orjson.dumps(self._list_tools_response)
+
+    def _register_tools(self, tool_definitions: list[dict]):
+        """Register all tools from all modules, appending their definitions."""
         modules = [
             self.sales_tools,
             self.product_tools,
@@ -48,11 +103,14 @@ class MCPHandler:
         for module in modules:
             for tool_def in module.get_tool_definitions():
                 tool_name = tool_def["name"]
-                self._tool_definitions.append(tool_def)
-                self._tool_registry[tool_name] = (module, tool_name)
+                tool_definitions.append(tool_def)
+                # Resolve the bound method and its signature once instead of on every call
+                self._tool_registry[tool_name] = _build_tool_entry(
+                    getattr(module, tool_name), tool_def.get("inputSchema")
+                )
                 logger.info(f"Registered tool: {tool_name}")
 
-        logger.info(f"Total tools registered: {len(self._tool_definitions)}")
+        logger.info(f"Total tools registered: {len(tool_definitions)}")
 
     def list_tools(self) -> dict:
         """
@@ -61,7 +119,33 @@ class MCPHandler:
         Returns:
             dict: {"tools": [tool_definitions]}
         """
-        return {"tools": self._tool_definitions}
+        return self._list_tools_response
+
+    def list_tools_json(self) -> bytes:
+        """
+        Return the tools/list result pre-encoded as JSON.
+
+        Returns:
+            bytes: orjson encoding of list_tools()
+        """
+        return self._list_tools_json
+
+    def list_tools_envelope(self, request_id: Any) -> bytes:
+        """
+        Return a complete JSON-RPC tools/list response as bytes.
+
+        Only the request id is encoded per call; the cached catalog is spliced in.
+
+        Args:
+            request_id: JSON-RPC id to echo back
+
+        Returns:
+            bytes: {"jsonrpc": "2.0", "id": request_id, "result": list_tools()}
+        """
+        return b'{"jsonrpc":"2.0","id":%s,"result":%s}' % (
+            orjson.dumps(request_id),
+            self._list_tools_json,
+        )
 
     async def call_tool(self, tool_name: str, arguments: dict) -> dict:
         """
@@ -74,38 +158,60 @@ class MCPHandler:
         Returns:
             dict: {"content": [{"type": "text", "text": "result"}]}
         """
-        if tool_name not in self._tool_registry:
+        entry = self._tool_registry.get(tool_name)
+        if entry is None:
             return {
                 "content": [{"type": "text", "text": f"Error: Unknown tool '{tool_name}'"}],
                 "isError": True,
             }
 
-        module, method_name = self._tool_registry[tool_name]
-
-        try:
-            # Get the method from the module
-            method = getattr(module, method_name)
-
-            # Call the method with arguments
-            result = method(**arguments)
-
-            return {
-                "content": [
-                    {"type": "text", "text": result if isinstance(result, str) else str(result)}
-                ]
-            }
-
-        except TypeError as e:
-            logger.error(f"Tool argument error: {e}")
+        # Reject bad argument names up front instead of relying on a TypeError
+        problems = []
+        if not isinstance(arguments, Mapping):
+            problems.append(f"arguments must be an object, got {type(arguments).__name__}")
+        else:
+            # Tool-calling LLMs often send explicit nulls for optional fields; treat
+            # them as omitted so the schema and the Python defaults both apply
+            if None in arguments.values():
+                arguments = {
+                    k: v for k, v in arguments.items() if v is not None or k in entry.required_args
+                }
+            missing = entry.required_args.difference(arguments)
+            if missing:
+                problems.append(f"missing required arguments: {', '.join(sorted(missing))}")
+            if entry.accepted_args is not None:
+                unexpected = arguments.keys() - entry.accepted_args
+                if unexpected:
+                    problems.append(f"unexpected arguments: {', '.join(sorted(unexpected))}")
+        if not problems and entry.validate is not None:
+            try:
+                entry.validate(arguments)
+            except fastjsonschema.JsonSchemaValueException as e:
+                problems.append(e.message)
+        if problems:
+            logger.error(f"Tool argument error: {tool_name}: {'; '.join(problems)}")
             return {
                 "content": [
                     {
                         "type": "text",
-                        "text": f"Error: Invalid arguments for tool '{tool_name}': {str(e)}",
+                        "text": (
+                            f"Error: Invalid arguments for tool '{tool_name}': "
+                            f"{'; '.join(problems)}"
+                        ),
                     }
                 ],
                 "isError": True,
             }
+
+        try:
+            # Run sync tools in a worker thread so they don't block the event loop
+            if entry.is_async:
+                result = await entry.method(**arguments)
+            else:
+                result = await asyncio.to_thread(entry.method, **arguments)
+
+            return {"content": [{"type": "text", "text": _result_text(result)}]}
+
         except Exception as e:
             logger.error(f"Tool execution error: {e}", exc_info=True)
             return {
@@ -4,20 +4,55 @@ Tests for MCP Handler
 Unit tests for the MCP protocol handler.
 """
 
-import json
+from datetime import datetime
+from decimal import Decimal
 
+import orjson
 import pytest
-from mcp_handler import MCPHandler
+from mcp_handler import MCPHandler, _result_text
+
+
+EXPECTED_TOOL_NAMES = frozenset(
+    {
+        # Sales analysis
+        "calculate_yoy_growth",
+        "calculate_mom_growth",
+        "calculate_moving_average",
+        "calculate_abc_analysis",
+        "calculate_sales_forecast",
+        # Product comparison
+        "compare_products",
+        "calculate_price_performance",
+        "suggest_alternatives",
+        "calculate_bundle_discount",
+        # Customer segment
+        "calculate_rfm_score",
+        "classify_customer_segment",
+        "calculate_clv",
+        "recommend_next_action",
+        # Inventory analysis
+        "calculate_inventory_turnover",
+        "calculate_reorder_point",
+        "identify_slow_moving_inventory",
+    }
+)
+
+
+@pytest.fixture(scope="module")
+def handler():
+    """Create one MCPHandler for the module; it holds no per-call state."""
+    return MCPHandler()
+
+
+@pytest.fixture(scope="module")
+def tool_names(handler):
+    """Names of every registered tool, collected once (immutable: shared by the module)."""
+    return frozenset(t["name"] for t in handler.list_tools()["tools"])
 
 
 class TestMCPHandler:
     """Tests for MCPHandler."""
 
-    @pytest.fixture
-    def handler(self):
-        """Create MCPHandler instance."""
-        return MCPHandler()
-
     def test_list_tools_returns_all_tools(self, handler):
         """list_tools should return all 16 tools."""
         result = handler.list_tools()
@@ -25,6 +60,22 @@ class TestMCPHandler:
         # 5 + 4 + 4 + 3 = 16 tools
         assert len(result["tools"]) == 16
 
+    def test_tools_count_matches_list_tools(self, handler):
+        """tools_count should match the number of tools returned by list_tools."""
+        assert handler.tools_count == len(handler.list_tools()["tools"])
+
+    def test_list_tools_json_matches_list_tools(self, handler):
+        """list_tools_json should decode to the list_tools response."""
+        decoded = orjson.loads(handler.list_tools_json())
+        assert decoded["tools"] == list(handler.list_tools()["tools"])
+
+    def test_list_tools_envelope(self, handler):
+        """list_tools_envelope should be a complete JSON-RPC response."""
+        envelope = orjson.loads(handler.list_tools_envelope("req-1"))
+        assert envelope["jsonrpc"] == "2.0"
+        assert envelope["id"] == "req-1"
+        assert len(envelope["result"]["tools"]) == handler.tools_count
+
     def test_list_tools_contains_required_fields(self, handler):
         """Each tool should have name, description, and inputSchema."""
         result = handler.list_tools()
@@ -33,27 +84,24 @@ class TestMCPHandler:
             assert "description" in tool
             assert "inputSchema" in tool
 
-    @pytest.mark.asyncio
     async def test_call_tool_yoy_growth(self, handler):
         """call_tool should execute yoy_growth correctly."""
         result = await handler.call_tool(
             "calculate_yoy_growth", {"current_value": 120000, "previous_value": 100000}
         )
         assert "content" in result
-        content = json.loads(result["content"][0]["text"])
+        content = orjson.loads(result["content"][0]["text"])
         assert content["growth_rate_percent"] == 20.0
 
-    @pytest.mark.asyncio
     async def test_call_tool_rfm_score(self, handler):
         """call_tool should execute rfm_score correctly."""
         result = await handler.call_tool(
             "calculate_rfm_score", {"recency_days": 5, "frequency": 10, "monetary": 200000}
         )
         assert "content" in result
-        content = json.loads(result["content"][0]["text"])
+        content = orjson.loads(result["content"][0]["text"])
         assert "rfm_scores" in content
 
-    @pytest.mark.asyncio
     async def test_call_tool_unknown(self, handler):
         """call_tool should handle unknown tool name."""
         result = await handler.call_tool("unknown_tool", {})
@@ -61,57 +109,85 @@ class TestMCPHandler:
         assert result.get("isError") is True
         assert "Unknown tool" in result["content"][0]["text"]
 
-    @pytest.mark.asyncio
     async def test_call_tool_missing_args(self, handler):
         """call_tool should handle missing required arguments."""
         result = await handler.call_tool(
             "calculate_yoy_growth",
             {"current_value": 100000},  # Missing previous_value
         )
-        # Should return error or handle gracefully
-        assert "content" in result or "error" in result
+        assert result.get("isError") is True
+        assert "missing required arguments: previous_value" in result["content"][0]["text"]
+
+    async def test_call_tool_unexpected_args(self, handler):
+        """call_tool should reject argument names the tool does not accept."""
+        result = await handler.call_tool(
+            "calculate_yoy_growth",
+            {"current_value": 1, "previous_value": 1, "bogus": 1},
+        )
+        assert result.get("isError") is True
+        assert "unexpected arguments: bogus" in result["content"][0]["text"]
+
+    @pytest.mark.parametrize("arguments", [None, [1, 2]])
+    async def test_call_tool_non_object_arguments(self, handler, arguments):
+        """call_tool should report non-object arguments as invalid, not raise."""
+        result = await handler.call_tool("calculate_yoy_growth", arguments)
+        assert result.get("isError") is True
+        assert "Invalid arguments" in result["content"][0]["text"]
+        assert "arguments must be an object" in result["content"][0]["text"]
+
+    @pytest.mark.parametrize(
+        ("tool_name", "arguments"),
+        [
+            (
+                "calculate_rfm_score",
+                {"recency_days": 5, "frequency": 10, "monetary": 200000, "customer_id": None},
+            ),
+            (
+                "classify_customer_segment",
+                {"r_score": 5, "f_score": 5, "m_score": 5, "customer_id": None},
+            ),
+            (
+                "recommend_next_action",
+                {"segment": "VIP顧客", "rfm_scores": None, "last_purchase_days": None},
+            ),
+        ],
+    )
+    async def test_call_tool_null_optional_args(self, handler, tool_name, arguments):
+        """call_tool should treat explicit nulls for optional arguments as omitted."""
+        result = await handler.call_tool(tool_name, arguments)
+        assert "isError" not in result
+        orjson.loads(result["content"][0]["text"])
+
+    async def test_call_tool_schema_type_mismatch(self, handler):
+        """call_tool should reject arguments that violate the tool's inputSchema."""
+        result = await handler.call_tool(
+            "calculate_yoy_growth", {"current_value": "lots", "previous_value": 1}
+        )
+        assert result.get("isError") is True
+        assert "data.current_value must be number" in result["content"][0]["text"]
 
 
 class TestMCPHandlerToolCategories:
     """Tests for tool categories in MCPHandler."""
 
-    @pytest.fixture
-    def handler(self):
-        """Create MCPHandler instance."""
-        return MCPHandler()
-
-    def test_sales_analysis_tools_registered(self, handler):
-        """Sales analysis tools should be registered."""
-        result = handler.list_tools()
-        tool_names = [t["name"] for t in result["tools"]]
-        assert "calculate_yoy_growth" in tool_names
-        assert "calculate_mom_growth" in tool_names
-        assert "calculate_moving_average" in tool_names
-        assert "calculate_abc_analysis" in tool_names
-        assert "calculate_sales_forecast" in tool_names
-
-    def test_product_comparison_tools_registered(self, handler):
-        """Product comparison tools should be registered."""
-        result = handler.list_tools()
-        tool_names = [t["name"] for t in result["tools"]]
-        assert "compare_products" in tool_names
-        assert "calculate_price_performance" in tool_names
-        assert "suggest_alternatives" in tool_names
-        assert "calculate_bundle_discount" in tool_names
-
-    def test_customer_segment_tools_registered(self, handler):
-        """Customer segment tools should be registered."""
-        result = handler.list_tools()
-        tool_names = [t["name"] for t in result["tools"]]
-        assert "calculate_rfm_score" in tool_names
-        assert "classify_customer_segment" in tool_names
-        assert "calculate_clv" in tool_names
-        assert "recommend_next_action" in tool_names
-
-    def test_inventory_analysis_tools_registered(self, handler):
-        """Inventory analysis tools should be registered."""
-        result = handler.list_tools()
-        tool_names = [t["name"] for t in result["tools"]]
-        assert "calculate_inventory_turnover" in tool_names
-        assert "calculate_reorder_point" in tool_names
-        assert "identify_slow_moving_inventory" in tool_names
+    def test_all_expected_tools_registered(self, tool_names):
+        """Every analytics tool should be registered."""
+        assert tool_names >= EXPECTED_TOOL_NAMES, EXPECTED_TOOL_NAMES - tool_names
+
+
+class TestResultText:
+    """Tests for tool result rendering."""
+
+    @pytest.mark.parametrize(
+        ("result", "expected"),
+        [
+            ('{"a": 1}', '{"a": 1}'),
+            (b'{"a":1}', '{"a":1}'),
+            ({"a": 1, "when": datetime(2026, 1, 2)}, '{"a":1,"when":"2026-01-02T00:00:00+00:00"}'),
+            ({"amount": Decimal("1.5")}, '{"amount":"1.5"}'),
+        ],
+        ids=["str", "bytes", "dict_with_datetime", "decimal_fallback"],
+    )
+    def test_result_text(self, result, expected):
+        """Strings pass through; structured results are JSON-encoded."""
+        assert _result_text(result) == expected
@@ -7,6 +7,7 @@ and inventory analysis tools.
 
 import json
 
+import orjson
 import pytest
 from tools.customer_segment import CustomerSegmentTools
 from tools.inventory_analysis import InventoryAnalysisTools
@@ -17,134 +18,164 @@ from tools.sales_analysis import SalesAnalysisTools
 class TestSalesAnalysisTools:
     """Tests for SalesAnalysisTools."""
 
-    @pytest.fixture
-    def tools(self):
-        """Create SalesAnalysisTools instance."""
-        return SalesAnalysisTools()
+    @classmethod
+    def setup_class(cls):
+        """Create one SalesAnalysisTools instance for the class."""
+        cls.tools = SalesAnalysisTools()
 
-    def test_get_tool_definitions_returns_list(self, tools):
+    def test_get_tool_definitions_returns_list(self):
         """Tool definitions should return a list of 5 tools."""
-        definitions = tools.get_tool_definitions()
+        definitions = self.tools.get_tool_definitions()
         assert isinstance(definitions, list)
         assert len(definitions) == 5
 
-    def test_calculate_yoy_growth_positive(self, tools):
+    def test_calculate_yoy_growth_positive(self):
         """YoY growth should calculate positive growth correctly."""
-        result = json.loads(tools.calculate_yoy_growth(120000, 100000))
+        result = self.tools._calculate_yoy_growth(120000, 100000)
         assert result["growth_rate_percent"] == 20.0
         assert result["change_amount"] == 20000
         assert result["trend"] == "増加"
 
-    def test_calculate_yoy_growth_negative(self, tools):
+    def test_calculate_yoy_growth_negative(self):
         """YoY growth should calculate negative growth correctly."""
-        result = json.loads(tools.calculate_yoy_growth(80000, 100000))
+        result = self.tools._calculate_yoy_growth(80000, 100000)
         assert result["growth_rate_percent"] == -20.0
         assert result["change_amount"] == -20000
         assert result["trend"] == "減少"
 
-    def test_calculate_yoy_growth_zero_previous(self, tools):
+    def test_calculate_yoy_growth_zero_previous(self):
         """YoY growth should handle zero previous value."""
-        result = json.loads(tools.calculate_yoy_growth(100000, 0))
+        result = self.tools._calculate_yoy_growth(100000, 0)
         assert result["growth_rate_percent"] is None  # Infinity
         assert "∞" in result["growth_rate_display"]
 
-    def test_calculate_mom_growth(self, tools):
+    def test_calculate_yoy_growth_oversized_int(self):
+        """Integers wider than 64 bits should still serialize to JSON."""
+        result = json.loads(self.tools.calculate_yoy_growth(current_value=2**70, previous_value=1))
+        assert result["current_value"] == 2**70
+        assert result["change_amount"] == 2**70 - 1
+
+    def test_calculate_mom_growth(self):
         """MoM growth calculation should work correctly."""
-        result = json.loads(tools.calculate_mom_growth(110000, 100000))
+        result = self.tools._calculate_mom_growth(110000, 100000)
         assert result["growth_rate_percent"] == 10.0
         assert result["trend"] == "増加"
 
-    def test_calculate_moving_average(self, tools):
+    def test_calculate_moving_average(self):
         """Moving average should be calculated correctly."""
         values = [100, 200, 300, 400, 500]
-        result = json.loads(tools.calculate_moving_average(values, period=3))
+        result = self.tools._calculate_moving_average(values, period=3)
         # MA: (100+200+300)/3=200, (200+300+400)/3=300, (300+400+500)/3=400
         assert result["moving_averages"] == [200.0, 300.0, 400.0]
         assert result["latest_value"] == 400.0
         assert result["trend"] == "上昇傾向"
 
-    def test_calculate_moving_average_insufficient_data(self, tools):
+    def test_calculate_moving_average_full_window(self):
+        """Moving average with period == len(values) should yield one value."""
+        result = self.tools._calculate_moving_average([10, 20, 30, 40], period=4)
+        assert result["moving_averages"] == [25.0]
+        assert result["trend"] is None
+
+    def test_calculate_moving_average_large_values_rounding(self):
+        """Moving average of large values should round each window's own sum."""
+        values = [1310732.471, 3184659.762, 8176638.228, 4728825.994]
+        result = self.tools._calculate_moving_average(values, period=2)
+        assert result["moving_averages"] == [2247696.12, 5680649.0, 6452732.11]
+
+    def test_calculate_moving_average_insufficient_data(self):
         """Moving average should handle insufficient data."""
         values = [100, 200]
-        result = json.loads(tools.calculate_moving_average(values, period=5))
+        result = self.tools._calculate_moving_average(values, period=5)
         assert "error" in result
 
-    def test_calculate_abc_analysis(self, tools):
+    def test_calculate_abc_analysis(self):
         """ABC analysis should classify items correctly."""
         items = [
             {"name": "Product A", "value": 70000},
             {"name": "Product B", "value": 20000},
             {"name": "Product C", "value": 10000},
         ]
-        result = json.loads(tools.calculate_abc_analysis(items))
+        result = self.tools._calculate_abc_analysis(items)
         assert result["summary"]["A_count"] >= 1
         assert "Product A" in result["summary"]["A_items"]
 
-    def test_calculate_abc_analysis_empty(self, tools):
+    def test_calculate_abc_analysis_empty(self):
         """ABC analysis should handle empty items."""
-        result = json.loads(tools.calculate_abc_analysis([]))
+        result = self.tools._calculate_abc_analysis([])
         assert "error" in result
 
-    def test_calculate_sales_forecast(self, tools):
+    def test_calculate_sales_forecast(self):
         """Sales forecast should predict future values."""
         # Linear growth: 100, 200, 300, 400 -> next should be ~500
         values = [100, 200, 300, 400]
-        result = json.loads(tools.calculate_sales_forecast(values, periods_ahead=1))
+        result = self.tools._calculate_sales_forecast(values, periods_ahead=1)
         assert len(result["forecasts"]) == 1
         assert result["forecasts"][0]["forecast_value"] == 500.0  # Linear extrapolation
         assert result["model"]["trend"] == "上昇"
 
-    def test_calculate_sales_forecast_insufficient_data(self, tools):
+    def test_calculate_sales_forecast_noisy(self):
+        """Sales forecast should fit the least-squares line on non-linear data."""
+        # x̄=3, ȳ=2.8, Σ(x-x̄)(y-ȳ)=4, Σ(x-x̄)²=10 -> slope 0.4, intercept 1.6
+        result = self.tools._calculate_sales_forecast([3, 1, 4, 1, 5], periods_ahead=1)
+        assert result["model"]["slope"] == 0.4
+        assert result["model"]["intercept"] == 1.6
+        assert result["forecasts"][0]["forecast_value"] == 4.0
+
+    def test_calculate_sales_forecast_large_flat_values(self):
+        """Sales forecast slope should stay exact for large values with small changes."""
+        values = [1e15, 1e15 + 1, 1e15 + 2, 1e15 + 3]
+        result = self.tools._calculate_sales_forecast(values, periods_ahead=1)
+        assert result["model"]["slope"] == 1.0
+
+    def test_calculate_sales_forecast_insufficient_data(self):
         """Sales forecast should require at least 2 data points."""
-        result = json.loads(tools.calculate_sales_forecast([100]))
+        result = self.tools._calculate_sales_forecast([100])
         assert "error" in result
 
 
 class TestProductComparisonTools:
     """Tests for ProductComparisonTools."""
 
-    @pytest.fixture
-    def tools(self):
-        """Create ProductComparisonTools instance."""
-        return ProductComparisonTools()
+    @classmethod
+    def setup_class(cls):
+        """Create one ProductComparisonTools instance for the class."""
+        cls.tools = ProductComparisonTools()
 
-    def test_get_tool_definitions_returns_list(self, tools):
+    def test_get_tool_definitions_returns_list(self):
         """Tool definitions should return a list of 4 tools."""
-        definitions = tools.get_tool_definitions()
+        definitions = self.tools.get_tool_definitions()
         assert isinstance(definitions, list)
         assert len(definitions) == 4
 
-    def test_compare_products(self, tools):
+    def test_compare_products(self):
         """Product comparison should compare two products."""
         product_a = {"name": "iPhone", "price": 150000, "specs": {"storage": 256, "ram": 6}}
         product_b = {"name": "Galaxy", "price": 120000, "specs": {"storage": 256, "ram": 8}}
-        result = json.loads(tools.compare_products(product_a, product_b))
+        result = self.tools._compare_products(product_a, product_b)
         assert "comparison_table" in result
         assert result["price_comparison"]["cheaper"] == "Galaxy"
         assert result["price_comparison"]["difference"] == 30000
 
-    def test_calculate_price_performance(self, tools):
+    def test_calculate_price_performance(self):
         """Price performance should calculate value score."""
-        result = json.loads(
-            tools.calculate_price_performance(
-                price=100000, performance_score=80, product_name="Test Product"
-            )
+        result = self.tools._calculate_price_performance(
+            price=100000, performance_score=80, product_name="Test Product"
         )
         assert "value_score" in result
         assert "rating" in result
         assert result["product_name"] == "Test Product"
 
-    def test_calculate_price_performance_invalid_price(self, tools):
+    def test_calculate_price_performance_invalid_price(self):
         """Price performance should handle invalid price."""
-        result = json.loads(tools.calculate_price_performance(price=0, performance_score=80))
+        result = self.tools._calculate_price_performance(price=0, performance_score=80)
         assert "error" in result
 
-    def test_calculate_price_performance_invalid_score(self, tools):
+    def test_calculate_price_performance_invalid_score(self):
         """Price performance should handle invalid score."""
-        result = json.loads(tools.calculate_price_performance(price=100000, performance_score=150))
+        result = self.tools._calculate_price_performance(price=100000, performance_score=150)
         assert "error" in result
 
-    def test_suggest_alternatives(self, tools):
+    def test_suggest_alternatives(self):
         """Alternative suggestion should score and rank candidates."""
         base = {
             "name": "Base Product",
@@ -156,22 +187,22 @@ class TestProductComparisonTools:
             {"name": "Alt 1", "price": 9000, "category": "Electronics", "features": ["wifi"]},
             {"name": "Alt 2", "price": 15000, "category": "Clothing", "features": ["cotton"]},
         ]
-        result = json.loads(tools.suggest_alternatives(base, candidates))
+        result = self.tools._suggest_alternatives(base, candidates)
         assert len(result["alternatives"]) == 2
         assert result["top_recommendation"]["name"] == "Alt 1"
 
-    def test_suggest_alternatives_empty(self, tools):
+    def test_suggest_alternatives_empty(self):
         """Alternative suggestion should handle empty candidates."""
-        result = json.loads(tools.suggest_alternatives({"name": "Base"}, []))
+        result = self.tools._suggest_alternatives({"name": "Base"}, [])
         assert "error" in result
 
-    def test_calculate_bundle_discount(self, tools):
+    def test_calculate_bundle_discount(self):
         """Bundle discount should calculate total savings."""
         products = [
             {"name": "Item A", "price": 10000, "quantity": 2},
             {"name": "Item B", "price": 5000, "quantity": 1},
         ]
-        result = json.loads(tools.calculate_bundle_discount(products))
+        result = self.tools._calculate_bundle_discount(products)
         assert result["subtotal"] == 25000  # 10000*2 + 5000*1
         assert result["discounts"]["total_discount"] > 0
         assert result["final_total"] < result["subtotal"]
@@ -180,121 +211,251 @@ class TestProductComparisonTools:
 class TestCustomerSegmentTools:
     """Tests for CustomerSegmentTools."""
 
-    @pytest.fixture
-    def tools(self):
-        """Create CustomerSegmentTools instance."""
-        return CustomerSegmentTools()
+    @classmethod
+    def setup_class(cls):
+        """Create one CustomerSegmentTools instance for the class."""
+        cls.tools = CustomerSegmentTools()
 
-    def test_get_tool_definitions_returns_list(self, tools):
+    def test_get_tool_definitions_returns_list(self):
         """Tool definitions should return a list of 4 tools."""
-        definitions = tools.get_tool_definitions()
+        definitions = self.tools.get_tool_definitions()
         assert isinstance(definitions, list)
         assert len(definitions) == 4
 
-    def test_calculate_rfm_score_vip(self, tools):
+    def test_get_tool_definitions_cached(self):
+        """Tool definitions should be built once and shared across calls."""
+        assert self.tools.get_tool_definitions() is CustomerSegmentTools().get_tool_definitions()
+
+    def test_methods_callable_without_instance(self):
+        """Stateless tools should be callable directly on the class."""
+        result = CustomerSegmentTools._classify_customer_segment(5, 5, 5)
+        assert result["segment"]["name"] == "VIP顧客"
+        assert not hasattr(self.tools, "__dict__")
+
+    def test_calculate_rfm_score_vip(self):
         """RFM score should identify VIP customer."""
         # Recent purchase (3 days), high frequency (25), high monetary (600000)
-        result = json.loads(
-            tools.calculate_rfm_score(recency_days=3, frequency=25, monetary=600000)
-        )
+        result = self.tools._calculate_rfm_score(recency_days=3, frequency=25, monetary=600000)
         assert result["rfm_scores"]["recency"] == 5
         assert result["rfm_scores"]["frequency"] == 5
         assert result["rfm_scores"]["monetary"] == 5
         assert result["score_label"] == "R5F5M5"
 
-    def test_calculate_rfm_score_dormant(self, tools):
+    def test_calculate_rfm_score_dormant(self):
         """RFM score should identify dormant customer."""
         # Old purchase (200 days), low frequency (1), low monetary (30000)
-        result = json.loads(
-            tools.calculate_rfm_score(recency_days=200, frequency=1, monetary=30000)
-        )
+        result = self.tools._calculate_rfm_score(recency_days=200, frequency=1, monetary=30000)
         assert result["rfm_scores"]["recency"] == 1
         assert result["rfm_scores"]["frequency"] == 1
         assert result["rfm_scores"]["monetary"] == 1
 
-    def test_classify_customer_segment_vip(self, tools):
+    def test_calculate_rfm_score_json_compact(self):
+        """JSON output should be compact and keep Japanese text unescaped."""
+        result = self.tools.calculate_rfm_score(recency_days=3, frequency=25, monetary=600000)
+        assert "\n" not in result
+        assert '"score_label":"R5F5M5"' in result
+        assert "優良顧客" in result
+
+    @pytest.mark.parametrize(
+        ("recency_days", "frequency", "monetary", "expected"),
+        [
+            (7, 20, 500000, (5, 5, 5)),
+            (8, 19, 499999, (4, 4, 4)),
+            (30, 10, 200000, (4, 4, 4)),
+            (31, 9, 199999, (3, 3, 3)),
+            (90, 5, 100000, (3, 3, 3)),
+            (91, 4, 99999, (2, 2, 2)),
+            (180, 2, 50000, (2, 2, 2)),
+            (181, 1, 49999, (1, 1, 1)),
+        ],
+    )
+    def test_calculate_rfm_score_boundaries(self, recency_days, frequency, monetary, expected):
+        """RFM scores should switch exactly at each threshold."""
+        result = self.tools._calculate_rfm_score(recency_days, frequency, monetary)
+        scores = result["rfm_scores"]
+        assert (scores["recency"], scores["frequency"], scores["monetary"]) == expected
+
+    def test_calculate_rfm_scores_batch_matches_scalar(self):
+        """Batch RFM scoring should agree with the per-customer scores."""
+        customers = [(3, 25, 600000), (45, 6, 150000), (200, 1, 30000)]
+        result = self.tools.calculate_rfm_scores_batch(*zip(*customers, strict=True))
+        for i, customer in enumerate(customers):
+            scores = self.tools._calculate_rfm_score(*customer)["rfm_scores"]
+            assert result["recency"][i] == scores["recency"]
+            assert result["frequency"][i] == scores["frequency"]
+            assert result["monetary"][i] == scores["monetary"]
+            assert result["total"][i] == scores["total"]
+
+    def test_calculate_rfm_scores_batch_length_mismatch(self):
+        """Batch RFM scoring should reject columns of different lengths."""
+        with pytest.raises(ValueError):
+            self.tools.calculate_rfm_scores_batch([3, 10], [5], [100000, 20000])
+
+    def test_classify_customer_segment_vip(self):
         """Segment classification should identify VIP."""
-        result = json.loads(tools.classify_customer_segment(r_score=5, f_score=5, m_score=5))
+        result = self.tools._classify_customer_segment(r_score=5, f_score=5, m_score=5)
         assert result["segment"]["name"] == "VIP顧客"
         assert result["segment"]["priority"] == 1
 
-    def test_classify_customer_segment_at_risk(self, tools):
+    def test_classify_customer_segment_at_risk(self):
         """Segment classification should identify at-risk customer."""
-        result = json.loads(tools.classify_customer_segment(r_score=1, f_score=2, m_score=4))
+        result = self.tools._classify_customer_segment(r_score=1, f_score=2, m_score=4)
         assert result["segment"]["name"] == "離反リスク顧客"
         assert result["segment"]["priority"] == 1
 
-    def test_calculate_clv(self, tools):
+    def test_classify_customer_segments_batch_matches_scalar(self):
+        """Batch classification should agree with the per-customer segments."""
+        triples = [(5, 5, 5), (1, 2, 4), (1, 1, 1), (3, 2, 2), (5, 1, 1)]
+        result = self.tools.classify_customer_segments_batch(*zip(*triples, strict=True))
+        for i, triple in enumerate(triples):
+            segment = self.tools._classify_customer_segment(*triple)["segment"]
+            assert result["segment"][i] == segment["name"]
+            assert result["priority"][i] == segment["priority"]
+
+    @pytest.mark.parametrize("customer_id", ["C001", 'quote"id', None])
+    def test_classify_customer_segment_json_splices_customer_id(self, customer_id):
+        """Cached JSON output should match the dict core for every customer_id."""
+        result = self.tools.classify_customer_segment(1, 2, 4, customer_id=customer_id)
+        expected = self.tools._classify_customer_segment(1, 2, 4, customer_id=customer_id)
+        assert orjson.loads(result) == expected
+        assert result.startswith('{"customer_id":')
+
+    def test_classify_customer_segment_repeat_call_isolated(self):
+        """Cached classification should still give each call its own result."""
+        first = self.tools._classify_customer_segment(5, 5, 5, customer_id="C001")
+        first["recommended_actions"].clear()
+        second = self.tools._classify_customer_segment(5, 5, 5, customer_id="C002")
+        assert second["customer_id"] == "C002"
+        assert len(second["recommended_actions"]) == 3
+
+    def test_calculate_clv(self):
         """CLV should calculate customer lifetime value."""
-        result = json.loads(
-            tools.calculate_clv(
-                average_purchase_value=50000,
-                purchase_frequency_per_year=4,
-                customer_lifespan_years=3,
-            )
+        result = self.tools._calculate_clv(
+            average_purchase_value=50000,
+            purchase_frequency_per_year=4,
+            customer_lifespan_years=3,
         )
         assert result["calculations"]["annual_revenue"] == 200000
         assert result["calculations"]["simple_clv"] == 600000
         assert "tier" in result
 
-    def test_recommend_next_action_vip(self, tools):
+    @pytest.mark.parametrize("discount_rate", [0, 0.1, 0.25])
+    def test_calculate_clv_npv_matches_yearly_sum(self, discount_rate):
+        """Closed-form NPV should equal the sum of the discounted yearly profits."""
+        result = self.tools._calculate_clv(
+            average_purchase_value=10000,
+            purchase_frequency_per_year=6,
+            customer_lifespan_years=5,
+            profit_margin=0.3,
+            discount_rate=discount_rate,
+        )
+        expected = sum(18000 / (1 + discount_rate) ** year for year in range(1, 6))
+        assert result["calculations"]["npv_clv"] == round(expected, 0)
+        assert [y["year"] for y in result["yearly_breakdown"]] == [1, 2, 3, 4, 5]
+
+    def test_calculate_clv_without_breakdown(self):
+        """CLV should skip the yearly breakdown when not requested."""
+        result = self.tools._calculate_clv(
+            average_purchase_value=10000,
+            purchase_frequency_per_year=6,
+            include_yearly_breakdown=False,
+        )
+        assert result["yearly_breakdown"] == []
+        assert result["calculations"]["npv_clv"] > 0
+
+    def test_recommend_next_action_vip(self):
         """Next action should recommend appropriate action for VIP."""
-        result = json.loads(tools.recommend_next_action(segment="VIP顧客"))
+        result = self.tools._recommend_next_action(segment="VIP顧客")
         assert result["recommendation"]["urgency"] == "通常"
         assert "専任担当者" in result["recommendation"]["channels"]
 
-    def test_recommend_next_action_at_risk(self, tools):
+    def test_recommend_next_action_at_risk(self):
         """Next action should recommend urgent action for at-risk."""
-        result = json.loads(
-            tools.recommend_next_action(segment="離反リスク顧客", last_purchase_days=100)
-        )
+        result = self.tools._recommend_next_action(segment="離反リスク顧客", last_purchase_days=100)
         assert result["recommendation"]["urgency"] == "緊急"
         assert len(result["action_items"]) >= 2
 
+    def test_recommend_next_action_inactivity_override_not_shared(self):
+        """An inactivity urgency override should not leak into later calls."""
+        escalated = self.tools._recommend_next_action(segment="VIP顧客", last_purchase_days=120)
+        assert escalated["recommendation"]["urgency"] == "高"
+        result = self.tools._recommend_next_action(segment="VIP顧客")
+        assert result["recommendation"]["urgency"] == "通常"
+        assert result["recommendation"]["channels"] == ["専任担当者", "電話", "限定イベント"]
+
+    def test_calculate_rfm_score_oversized_int(self):
+        """Compact JSON output should also handle integers wider than 64 bits."""
+        result = json.loads(self.tools.calculate_rfm_score(3, 25, 2**70))
+        assert result["input_data"]["monetary"] == 2**70
+        assert result["rfm_scores"]["monetary"] == 5
+
+    def test_dict_cores_chain_without_json(self):
+        """RFM -> segment -> next action should chain on dicts alone."""
+        rfm = self.tools._calculate_rfm_score(recency_days=3, frequency=25, monetary=600000)
+        scores = rfm["rfm_scores"]
+        segment = self.tools._classify_customer_segment(
+            scores["recency"], scores["frequency"], scores["monetary"]
+        )
+        result = self.tools._recommend_next_action(
+            segment=segment["segment"]["name"], rfm_scores=scores
+        )
+        assert result["segment"] == "VIP顧客"
+        assert result == orjson.loads(
+            self.tools.recommend_next_action(segment=segment["segment"]["name"], rfm_scores=scores)
+        )
+
 
 class TestInventoryAnalysisTools:
     """Tests for InventoryAnalysisTools."""
 
-    @pytest.fixture
-    def tools(self):
-        """Create InventoryAnalysisTools instance."""
-        return InventoryAnalysisTools()
+    @classmethod
+    def setup_class(cls):
+        """Create one InventoryAnalysisTools instance for the class."""
+        cls.tools = InventoryAnalysisTools()
 
-    def test_get_tool_definitions_returns_list(self, tools):
+    def test_get_tool_definitions_returns_list(self):
         """Tool definitions should return a list of 3 tools."""
-        definitions = tools.get_tool_definitions()
+        definitions = self.tools.get_tool_definitions()
         assert isinstance(definitions, list)
         assert len(definitions) == 3
 
-    def test_calculate_inventory_turnover_high(self, tools):
+    def test_calculate_inventory_turnover_high(self):
         """Inventory turnover should calculate high turnover correctly."""
         # COGS 1,200,000, Avg inventory 100,000 -> 12x turnover
-        result = json.loads(
-            tools.calculate_inventory_turnover(cost_of_goods_sold=1200000, average_inventory=100000)
+        result = self.tools._calculate_inventory_turnover(
+            cost_of_goods_sold=1200000, average_inventory=100000
         )
         assert result["metrics"]["turnover_ratio"] == 12.0
         assert "非常に高回転" in result["rating"]
 
-    def test_calculate_inventory_turnover_low(self, tools):
+    def test_calculate_inventory_turnover_low(self):
         """Inventory turnover should identify low turnover."""
         # COGS 100,000, Avg inventory 100,000 -> 1x turnover
-        result = json.loads(
-            tools.calculate_inventory_turnover(cost_of_goods_sold=100000, average_inventory=100000)
+        result = self.tools._calculate_inventory_turnover(
+            cost_of_goods_sold=100000, average_inventory=100000
         )
         assert result["metrics"]["turnover_ratio"] == 1.0
         assert "低回転" in result["rating"]
 
-    def test_calculate_inventory_turnover_invalid(self, tools):
+    def test_calculate_inventory_turnover_invalid(self):
         """Inventory turnover should handle invalid input."""
-        result = json.loads(
-            tools.calculate_inventory_turnover(cost_of_goods_sold=100000, average_inventory=0)
+        result = self.tools._calculate_inventory_turnover(
+            cost_of_goods_sold=100000, average_inventory=0
         )
         assert "error" in result
 
-    def test_calculate_reorder_point(self, tools):
+    def test_calculate_inventory_turnover_json_no_sales(self):
+        """JSON output should be strict JSON with unescaped Japanese text."""
+        result = self.tools.calculate_inventory_turnover(
+            cost_of_goods_sold=0, average_inventory=100000
+        )
+        assert "低回転" in result
+        assert orjson.loads(result)["metrics"]["days_in_inventory"] is None
+
+    def test_calculate_reorder_point(self):
         """Reorder point should calculate correctly."""
-        result = json.loads(
-            tools.calculate_reorder_point(daily_demand=10, lead_time_days=7, safety_stock_days=3)
+        result = self.tools._calculate_reorder_point(
+            daily_demand=10, lead_time_days=7, safety_stock_days=3
         )
         # Lead time demand = 10 * 7 = 70
         # Safety stock (fixed) = 10 * 3 = 30
@@ -302,7 +463,7 @@ class TestInventoryAnalysisTools:
         assert result["calculations"]["lead_time_demand"] == 70
         assert result["calculations"]["reorder_point"] >= 100
 
-    def test_identify_slow_moving_inventory(self, tools):
+    def test_identify_slow_moving_inventory(self):
         """Slow moving identification should classify items correctly."""
         items = [
             {
@@ -327,13 +488,40 @@ class TestInventoryAnalysisTools:
                 "monthly_sales": 20,
             },
         ]
-        result = json.loads(tools.identify_slow_moving_inventory(items))
+        result = self.tools._identify_slow_moving_inventory(items)
         assert result["summary"]["dead_stock_count"] == 1
         assert result["summary"]["slow_moving_count"] == 1
         assert result["summary"]["healthy_count"] == 1
         assert "Dead Item" in result["summary"]["dead_stock_items"]
 
-    def test_identify_slow_moving_inventory_empty(self, tools):
+    def test_identify_slow_moving_inventory_risk_order(self):
+        """Analyzed items should list dead stock, then slow moving, then healthy."""
+        fields = ("name", "quantity", "unit_cost", "days_in_stock", "monthly_sales")
+        rows = [
+            ("H1", 10, 100, 10, 10),
+            ("S1", 70, 100, 10, 10),  # 7 months of stock
+            ("D1", 10, 100, 10, 0),  # no sales
+            ("H2", 5, 100, 20, 5),
+            ("D2", 1, 100, 181, 1),  # > 2x threshold
+        ]
+        items = [dict(zip(fields, row, strict=True)) for row in rows]
+        result = self.tools._identify_slow_moving_inventory(items)
+        assert [i["name"] for i in result["analyzed_items"]] == ["D1", "D2", "S1", "H1", "H2"]
+        # Dead stock at full value, slow moving at 50%
+        assert result["financial_impact"]["total_value_at_risk"] == 1000 + 100 + 3500
+
+    def test_identify_slow_moving_inventory_empty(self):
         """Slow moving identification should handle empty list."""
-        result = json.loads(tools.identify_slow_moving_inventory([]))
+        result = self.tools._identify_slow_moving_inventory([])
         assert "error" in result
+
+
+def test_package_exports_resolve_lazily():
+    """Package-level names should resolve to the submodule classes."""
+    import tools
+
+    assert tools.SalesAnalysisTools is SalesAnalysisTools
+    assert tools.InventoryAnalysisTools is InventoryAnalysisTools
+    assert set(tools.__all__) <= set(dir(tools))
+    with pytest.raises(AttributeError):
+        tools.UnknownTools  # noqa: B018
@@ -2,12 +2,26 @@
 MCP Tools Package
 
 Business analytics tools for the Agentic AI application.
+
+The tool classes are loaded on first attribute access (PEP 562), so importing
+one submodule such as ``tools.sales_analysis`` does not import the other three.
 """
 
-from .customer_segment import CustomerSegmentTools
-from .inventory_analysis import InventoryAnalysisTools
-from .product_comparison import ProductComparisonTools
-from .sales_analysis import SalesAnalysisTools
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .customer_segment import CustomerSegmentTools
+    from .inventory_analysis import InventoryAnalysisTools
+    from .product_comparison import ProductComparisonTools
+    from .sales_analysis import SalesAnalysisTools
+
+_LAZY_IMPORTS = {
+    "SalesAnalysisTools": ".sales_analysis",
+    "ProductComparisonTools": ".product_comparison",
+    "CustomerSegmentTools": ".customer_segment",
+    "InventoryAnalysisTools": ".inventory_analysis",
+}
 
 __all__ = [
     "SalesAnalysisTools",
@@ -15,3 +29,17 @@ __all__ = [
     "CustomerSegmentTools",
     "InventoryAnalysisTools",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
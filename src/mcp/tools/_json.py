@@ -0,0 +1,31 @@
+"""
+Shared JSON encoding for the tool modules.
+"""
+
+import json
+from typing import Any
+
+import orjson
+
+
+def to_json(result: Any, *, indent: bool = False) -> str:
+    """
+    Serialize a tool result to a JSON string.
+
+    orjson rejects integers wider than 64 bits, which the unbounded
+    ``number``/``integer`` tool schemas still allow; such results fall back to
+    the standard library encoder with the same layout.
+
+    Args:
+        result: JSON-compatible tool result
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        JSON string
+    """
+    try:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2 if indent else None).decode()
+    except TypeError:  # orjson.JSONEncodeError subclasses TypeError
+        if indent:
+            return json.dumps(result, ensure_ascii=False, indent=2)
+        return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
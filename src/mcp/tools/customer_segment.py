@@ -5,101 +5,303 @@ Provides tools for customer analysis including RFM scoring, customer segmentatio
 Customer Lifetime Value (CLV) calculation, and next action recommendations.
 """
 
-import json
-
-
-class CustomerSegmentTools:
-    """Customer segmentation and analysis tools."""
-
-    def get_tool_definitions(self) -> list[dict]:
-        """Return MCP tool definitions for customer segmentation tools."""
-        return [
-            {
-                "name": "calculate_rfm_score",
-                "description": "RFM分析（Recency, Frequency, Monetary）スコアを計算します。顧客の購買行動を3軸で評価。",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "recency_days": {"type": "integer", "description": "最終購入からの日数"},
-                        "frequency": {"type": "integer", "description": "購入回数（期間内）"},
-                        "monetary": {"type": "number", "description": "累計購入金額"},
-                        "customer_id": {"type": "string", "description": "顧客ID（オプション）"},
-                    },
-                    "required": ["recency_days", "frequency", "monetary"],
-                },
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+import orjson
+
+from ._json import to_json
+
+# RFM score boundaries, ascending. Recency: <=7d is 5 ... >180d is 1.
+# Frequency / Monetary: >= the last boundary is 5, below the first is 1.
+_RECENCY_BINS = (7, 30, 90, 180)
+_FREQUENCY_BINS = (2, 5, 10, 20)
+_MONETARY_BINS = (50000, 100000, 200000, 500000)
+
+# Static MCP tool definitions, built once at import
+_TOOL_DEFINITIONS: list[dict] = [
+    {
+        "name": "calculate_rfm_score",
+        "description": "RFM分析（Recency, Frequency, Monetary）スコアを計算します。顧客の購買行動を3軸で評価。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "recency_days": {"type": "integer", "description": "最終購入からの日数"},
+                "frequency": {"type": "integer", "description": "購入回数（期間内）"},
+                "monetary": {"type": "number", "description": "累計購入金額"},
+                "customer_id": {"type": "string", "description": "顧客ID（オプション）"},
             },
-            {
-                "name": "classify_customer_segment",
-                "description": "RFMスコアに基づいて顧客をセグメント分類します（VIP、優良顧客、休眠顧客など）。",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "r_score": {"type": "integer", "description": "Recencyスコア（1-5）"},
-                        "f_score": {"type": "integer", "description": "Frequencyスコア（1-5）"},
-                        "m_score": {"type": "integer", "description": "Monetaryスコア（1-5）"},
-                        "customer_id": {"type": "string", "description": "顧客ID（オプション）"},
-                    },
-                    "required": ["r_score", "f_score", "m_score"],
-                },
+            "required": ["recency_days", "frequency", "monetary"],
+        },
+    },
+    {
+        "name": "classify_customer_segment",
+        "description": "RFMスコアに基づいて顧客をセグメント分類します（VIP、優良顧客、休眠顧客など）。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "r_score": {"type": "integer", "description": "Recencyスコア（1-5）"},
+                "f_score": {"type": "integer", "description": "Frequencyスコア（1-5）"},
+                "m_score": {"type": "integer", "description": "Monetaryスコア（1-5）"},
+                "customer_id": {"type": "string", "description": "顧客ID（オプション）"},
             },
-            {
-                "name": "calculate_clv",
-                "description": "顧客生涯価値（CLV: Customer Lifetime Value）を計算します。",
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "average_purchase_value": {"type": "number", "description": "平均購入単価"},
-                        "purchase_frequency_per_year": {
-                            "type": "number",
-                            "description": "年間平均購入回数",
-                        },
-                        "customer_lifespan_years": {
-                            "type": "number",
-                            "description": "顧客継続年数（予測）",
-                            "default": 3,
-                        },
-                        "profit_margin": {
-                            "type": "number",
-                            "description": "利益率（0-1）",
-                            "default": 0.3,
-                        },
-                        "discount_rate": {
-                            "type": "number",
-                            "description": "割引率（NPV計算用）",
-                            "default": 0.1,
-                        },
-                    },
-                    "required": ["average_purchase_value", "purchase_frequency_per_year"],
+            "required": ["r_score", "f_score", "m_score"],
+        },
+    },
+    {
+        "name": "calculate_clv",
+        "description": "顧客生涯価値（CLV: Customer Lifetime Value）を計算します。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "average_purchase_value": {"type": "number", "description": "平均購入単価"},
+                "purchase_frequency_per_year": {
+                    "type": "number",
+                    "description": "年間平均購入回数",
+                },
+                "customer_lifespan_years": {
+                    "type": "number",
+                    "description": "顧客継続年数（予測）",
+                    "default": 3,
+                },
+                "profit_margin": {
+                    "type": "number",
+                    "description": "利益率（0-1）",
+                    "default": 0.3,
+                },
+                "discount_rate": {
+                    "type": "number",
+                    "description": "割引率（NPV計算用）",
+                    "default": 0.1,
+                },
+                "include_yearly_breakdown": {
+                    "type": "boolean",
+                    "description": "年次内訳を含めるか",
+                    "default": True,
                 },
             },
-            {
-                "name": "recommend_next_action",
-                "description": "顧客セグメントに基づいてNext Best Actionを提案します。",
-                "inputSchema": {
+            "required": ["average_purchase_value", "purchase_frequency_per_year"],
+        },
+    },
+    {
+        "name": "recommend_next_action",
+        "description": "顧客セグメントに基づいてNext Best Actionを提案します。",
+        "inputSchema": {
+            "type": "object",
+            "properties": {
+                "segment": {"type": "string", "description": "顧客セグメント名"},
+                "rfm_scores": {
                     "type": "object",
                     "properties": {
-                        "segment": {"type": "string", "description": "顧客セグメント名"},
-                        "rfm_scores": {
-                            "type": "object",
-                            "properties": {
-                                "r": {"type": "integer"},
-                                "f": {"type": "integer"},
-                                "m": {"type": "integer"},
-                            },
-                            "description": "RFMスコア（オプション）",
-                        },
-                        "last_purchase_days": {
-                            "type": "integer",
-                            "description": "最終購入からの日数（オプション）",
-                        },
+                        "r": {"type": "integer"},
+                        "f": {"type": "integer"},
+                        "m": {"type": "integer"},
                     },
-                    "required": ["segment"],
+                    "description": "RFMスコア（オプション）",
+                },
+                "last_purchase_days": {
+                    "type": "integer",
+                    "description": "最終購入からの日数（オプション）",
                 },
             },
-        ]
+            "required": ["segment"],
+        },
+    },
+]
+
+
+def _annuity_npv(annual_profit: float, years: int, discount_rate: float) -> float:
+    """Present value of ``years`` end-of-year payments: Σ_{t=1..n} P / (1 + d)^t."""
+    if discount_rate == 0 or years == 0:
+        return annual_profit * years
+    # Closed form of the annuity-immediate: P * (1 - (1 + d)^-n) / d
+    return annual_profit * (1 - (1 + discount_rate) ** -years) / discount_rate
+
+
+def _rfm_scores(recency_days: int, frequency: int, monetary: float) -> tuple[int, int, int]:
+    """Map raw RFM values to 1-5 scores."""
+    return (
+        # Recency: lower days = higher score
+        5 - bisect_left(_RECENCY_BINS, recency_days),
+        # Frequency / Monetary: higher value = higher score
+        1 + bisect_right(_FREQUENCY_BINS, frequency),
+        1 + bisect_right(_MONETARY_BINS, monetary),
+    )
+
+
+# Recommended actions by segment
+_SEGMENT_ACTIONS: dict[str, tuple[str, ...]] = {
+    "VIP顧客": ("専任担当者のアサイン", "プレミアム特典の提供", "先行販売への招待"),
+    "優良顧客": ("ロイヤルティプログラム案内", "レビュー依頼", "紹介キャンペーン"),
+    "有望顧客": ("関連商品のレコメンド", "セット割引の提案", "会員ランクアップ案内"),
+    "新規顧客": ("ウェルカムメール", "チュートリアル案内", "初回購入特典"),
+    "休眠優良顧客": ("パーソナライズドオファー", "復帰キャンペーン", "アンケート実施"),
+    "離反リスク顧客": ("緊急フォローコール", "限定割引クーポン", "サービス改善ヒアリング"),
+    "休眠顧客": ("再活性化メール", "大幅割引オファー", "新商品案内"),
+    "一般顧客": ("定期メルマガ", "季節キャンペーン案内", "レビュー依頼"),
+}
+
+
+class _SegmentInfo(NamedTuple):
+    """Static details of a customer segment, including its rendered analysis line."""
+
+    description: str
+    priority: int
+    color: str
+    analysis: str
+
+
+def _segment_info(segment: str, description: str, priority: int, color: str) -> _SegmentInfo:
+    analysis = f"顧客セグメント: {segment}（優先度{priority}）- {description}"
+    return _SegmentInfo(description, priority, color, analysis)
+
+
+_SEGMENT_INFO: dict[str, _SegmentInfo] = {
+    "VIP顧客": _segment_info(
+        "VIP顧客", "最も価値の高い顧客。特別な待遇と優先対応が必要", 1, "gold"
+    ),
+    "優良顧客": _segment_info(
+        "優良顧客", "高頻度で購入する上位顧客。ロイヤルティ維持が重要", 2, "green"
+    ),
+    "有望顧客": _segment_info(
+        "有望顧客", "成長可能性のある顧客。アップセル/クロスセルの機会", 3, "blue"
+    ),
+    "新規顧客": _segment_info(
+        "新規顧客", "最近購入を始めた顧客。エンゲージメント強化が必要", 4, "cyan"
+    ),
+    "休眠優良顧客": _segment_info(
+        "休眠優良顧客", "以前は優良だったが最近購入がない。再活性化が必要", 2, "orange"
+    ),
+    "離反リスク顧客": _segment_info(
+        "離反リスク顧客", "高額購入履歴があるが離反の兆候。緊急フォロー必要", 1, "red"
+    ),
+    "休眠顧客": _segment_info(
+        "休眠顧客", "長期間購入がない顧客。再活性化キャンペーンの対象", 5, "gray"
+    ),
+    "一般顧客": _segment_info("一般顧客", "標準的な購買パターンの顧客", 4, "white"),
+}
+
+
+@lru_cache(maxsize=256)
+def _classify_rfm_segment(r_score: int, f_score: int, m_score: int) -> str:
+    """Return the segment name for an RFM score triple."""
+    if r_score >= 4 and f_score >= 4 and m_score >= 4:
+        return "VIP顧客"
+    if r_score >= 4 and f_score >= 3 and m_score >= 3:
+        return "優良顧客"
+    if r_score >= 3 and f_score >= 3:
+        return "有望顧客"
+    if r_score >= 4 and f_score <= 2:
+        return "新規顧客"
+    if r_score <= 2 and f_score >= 3:
+        return "休眠優良顧客"
+    if r_score <= 2 and m_score >= 3:
+        return "離反リスク顧客"
+    if r_score <= 2 and f_score <= 2 and m_score <= 2:
+        return "休眠顧客"
+    return "一般顧客"
+
+
+# Next-best-action catalog by segment (read-only; channels are tuples)
+_ACTION_CATALOG: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+    {
+        segment: MappingProxyType(info)
+        for segment, info in {
+            "VIP顧客": {
+                "primary_action": "パーソナライズドサービス提供",
+                "channels": ("専任担当者", "電話", "限定イベント"),
+                "offer_type": "プレミアム特典",
+                "urgency": "通常",
+                "message_tone": "感謝・特別感",
+            },
+            "優良顧客": {
+                "primary_action": "ロイヤルティ強化施策",
+                "channels": ("メール", "アプリ通知", "DM"),
+                "offer_type": "ポイント還元・限定商品",
+                "urgency": "通常",
+                "message_tone": "感謝・インセンティブ",
+            },
+            "有望顧客": {
+                "primary_action": "アップセル/クロスセル提案",
+                "channels": ("メール", "Web", "アプリ"),
+                "offer_type": "セット割引・関連商品",
+                "urgency": "中",
+                "message_tone": "おすすめ・お得感",
+            },
+            "新規顧客": {
+                "primary_action": "オンボーディング完了",
+                "channels": ("メール", "アプリ", "LINE"),
+                "offer_type": "初回購入特典・チュートリアル",
+                "urgency": "高",
+                "message_tone": "歓迎・サポート",
+            },
+            "休眠優良顧客": {
+                "primary_action": "再活性化キャンペーン",
+                "channels": ("メール", "電話", "DM"),
+                "offer_type": "復帰特典・限定割引",
+                "urgency": "高",
+                "message_tone": "お久しぶり・特別オファー",
+            },
+            "離反リスク顧客": {
+                "primary_action": "緊急リテンション施策",
+                "channels": ("電話", "メール", "訪問"),
+                "offer_type": "大幅割引・サービス改善提案",
+                "urgency": "緊急",
+                "message_tone": "謝罪・改善約束",
+            },
+            "休眠顧客": {
+                "primary_action": "休眠掘り起こし",
+                "channels": ("メール", "郵送DM"),
+                "offer_type": "大幅割引・新商品案内",
+                "urgency": "低",
+                "message_tone": "新着情報・お得感",
+            },
+            "一般顧客": {
+                "primary_action": "定期エンゲージメント",
+                "channels": ("メール", "SNS"),
+                "offer_type": "季節キャンペーン",
+                "urgency": "低",
+                "message_tone": "情報提供",
+            },
+        }.items()
+    }
+)
+
+# Segments that already carry their own urgency; never escalated by inactivity
+_URGENCY_OVERRIDE_EXEMPT = frozenset({"休眠顧客", "離反リスク顧客"})
+
+# Fixed (priority, action, deadline) items for urgent and high-urgency recommendations
+_ACTION_ITEMS_BY_URGENCY: Mapping[str, tuple[tuple[int, str, str], ...]] = MappingProxyType(
+    {
+        "緊急": (
+            (1, "担当者による電話連絡", "24時間以内"),
+            (2, "特別オファー準備", "48時間以内"),
+            (3, "フォローアップメール送信", "1週間以内"),
+        ),
+        "高": (
+            (1, "パーソナライズドメール送信", "3日以内"),
+            (2, "クーポン/オファー発行", "1週間以内"),
+        ),
+    }
+)
+
+
+class CustomerSegmentTools:
+    """Customer segmentation and analysis tools (stateless; every method is static)."""
+
+    __slots__ = ()
 
+    @staticmethod
+    def get_tool_definitions() -> list[dict]:
+        """Return MCP tool definitions for customer segmentation tools (shared; do not mutate)."""
+        return _TOOL_DEFINITIONS
+
+    @staticmethod
     def calculate_rfm_score(
-        self, recency_days: int, frequency: int, monetary: float, customer_id: str | None = None
+        recency_days: int, frequency: int, monetary: float, customer_id: str | None = None
     ) -> str:
         """
         Calculate RFM scores.
@@ -113,42 +315,17 @@ class CustomerSegmentTools:
         Returns:
             JSON string with RFM scores
         """
-        # Recency score (1-5): lower days = higher score
-        if recency_days <= 7:
-            r_score = 5
-        elif recency_days <= 30:
-            r_score = 4
-        elif recency_days <= 90:
-            r_score = 3
-        elif recency_days <= 180:
-            r_score = 2
-        else:
-            r_score = 1
-
-        # Frequency score (1-5): higher frequency = higher score
-        if frequency >= 20:
-            f_score = 5
-        elif frequency >= 10:
-            f_score = 4
-        elif frequency >= 5:
-            f_score = 3
-        elif frequency >= 2:
-            f_score = 2
-        else:
-            f_score = 1
-
-        # Monetary score (1-5): higher spending = higher score
-        if monetary >= 500000:
-            m_score = 5
-        elif monetary >= 200000:
-            m_score = 4
-        elif monetary >= 100000:
-            m_score = 3
-        elif monetary >= 50000:
-            m_score = 2
-        else:
-            m_score = 1
-
+        result = CustomerSegmentTools._calculate_rfm_score(
+            recency_days, frequency, monetary, customer_id
+        )
+        return to_json(result)
+
+    @staticmethod
+    def _calculate_rfm_score(
+        recency_days: int, frequency: int, monetary: float, customer_id: str | None = None
+    ) -> dict[str, Any]:
+        """Same as ``calculate_rfm_score`` but returns the result dict unserialized."""
+        r_score, f_score, m_score = _rfm_scores(recency_days, frequency, monetary)
         total_score = r_score + f_score + m_score
         avg_score = total_score / 3
 
@@ -170,10 +347,77 @@ class CustomerSegmentTools:
             "analysis": f"RFM分析: R{r_score}F{f_score}M{m_score}（平均{avg_score:.1f}点）- {'優良顧客' if avg_score >= 4 else '一般顧客' if avg_score >= 2.5 else '要フォロー顧客'}",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
+
+    @staticmethod
+    def calculate_rfm_scores_batch(
+        recency_days: Sequence[int],
+        frequency: Sequence[int],
+        monetary: Sequence[float],
+    ) -> dict[str, list[int]]:
+        """
+        Calculate RFM scores for many customers in one pass.
+
+        Not exposed as an MCP tool; for in-process callers scoring a whole customer
+        table. Scores match calculate_rfm_score element by element.
+
+        Args:
+            recency_days: Days since last purchase, one per customer
+            frequency: Number of purchases, one per customer
+            monetary: Total purchase amount, one per customer
+
+        Returns:
+            Parallel lists of recency, frequency, monetary and total scores
+
+        Raises:
+            ValueError: If the input sequences differ in length
+        """
+        r_scores = [5 - bisect_left(_RECENCY_BINS, r) for r in recency_days]
+        f_scores = [1 + bisect_right(_FREQUENCY_BINS, f) for f in frequency]
+        m_scores = [1 + bisect_right(_MONETARY_BINS, m) for m in monetary]
+        totals = [r + f + m for r, f, m in zip(r_scores, f_scores, m_scores, strict=True)]
+        return {
+            "recency": r_scores,
+            "frequency": f_scores,
+            "monetary": m_scores,
+            "total": totals,
+        }
+
+    @staticmethod
+    def classify_customer_segments_batch(
+        r_scores: Sequence[int],
+        f_scores: Sequence[int],
+        m_scores: Sequence[int],
+    ) -> dict[str, list[Any]]:
+        """
+        Classify many customers into segments in one pass.
+
+        Not exposed as an MCP tool; pairs with calculate_rfm_scores_batch for
+        in-process callers. Segments match classify_customer_segment element by element.
 
+        Args:
+            r_scores: Recency scores (1-5), one per customer
+            f_scores: Frequency scores (1-5), one per customer
+            m_scores: Monetary scores (1-5), one per customer
+
+        Returns:
+            Parallel lists of segment names and priorities
+
+        Raises:
+            ValueError: If the input sequences differ in length
+        """
+        segments = [
+            _classify_rfm_segment(r, f, m)
+            for r, f, m in zip(r_scores, f_scores, m_scores, strict=True)
+        ]
+        return {
+            "segment": segments,
+            "priority": [_SEGMENT_INFO[segment].priority for segment in segments],
+        }
+
+    @staticmethod
     def classify_customer_segment(
-        self, r_score: int, f_score: int, m_score: int, customer_id: str | None = None
+        r_score: int, f_score: int, m_score: int, customer_id: str | None = None
     ) -> str:
         """
         Classify customer into segments based on RFM scores.
@@ -187,82 +431,49 @@ class CustomerSegmentTools:
         Returns:
             JSON string with segment classification
         """
-        # Segment classification logic
-        if r_score >= 4 and f_score >= 4 and m_score >= 4:
-            segment = "VIP顧客"
-            description = "最も価値の高い顧客。特別な待遇と優先対応が必要"
-            priority = 1
-            color = "gold"
-        elif r_score >= 4 and f_score >= 3 and m_score >= 3:
-            segment = "優良顧客"
-            description = "高頻度で購入する上位顧客。ロイヤルティ維持が重要"
-            priority = 2
-            color = "green"
-        elif r_score >= 3 and f_score >= 3:
-            segment = "有望顧客"
-            description = "成長可能性のある顧客。アップセル/クロスセルの機会"
-            priority = 3
-            color = "blue"
-        elif r_score >= 4 and f_score <= 2:
-            segment = "新規顧客"
-            description = "最近購入を始めた顧客。エンゲージメント強化が必要"
-            priority = 4
-            color = "cyan"
-        elif r_score <= 2 and f_score >= 3:
-            segment = "休眠優良顧客"
-            description = "以前は優良だったが最近購入がない。再活性化が必要"
-            priority = 2
-            color = "orange"
-        elif r_score <= 2 and m_score >= 3:
-            segment = "離反リスク顧客"
-            description = "高額購入履歴があるが離反の兆候。緊急フォロー必要"
-            priority = 1
-            color = "red"
-        elif r_score <= 2 and f_score <= 2 and m_score <= 2:
-            segment = "休眠顧客"
-            description = "長期間購入がない顧客。再活性化キャンペーンの対象"
-            priority = 5
-            color = "gray"
-        else:
-            segment = "一般顧客"
-            description = "標準的な購買パターンの顧客"
-            priority = 4
-            color = "white"
-
-        # Recommended actions based on segment
-        actions = {
-            "VIP顧客": ["専任担当者のアサイン", "プレミアム特典の提供", "先行販売への招待"],
-            "優良顧客": ["ロイヤルティプログラム案内", "レビュー依頼", "紹介キャンペーン"],
-            "有望顧客": ["関連商品のレコメンド", "セット割引の提案", "会員ランクアップ案内"],
-            "新規顧客": ["ウェルカムメール", "チュートリアル案内", "初回購入特典"],
-            "休眠優良顧客": ["パーソナライズドオファー", "復帰キャンペーン", "アンケート実施"],
-            "離反リスク顧客": ["緊急フォローコール", "限定割引クーポン", "サービス改善ヒアリング"],
-            "休眠顧客": ["再活性化メール", "大幅割引オファー", "新商品案内"],
-            "一般顧客": ["定期メルマガ", "季節キャンペーン案内", "レビュー依頼"],
-        }
+        # Only customer_id varies for a given score triple; splice it into the cached JSON
+        tail = CustomerSegmentTools._classify_customer_segment_json_tail(r_score, f_score, m_score)
+        return (b'{"customer_id":%s,%s' % (orjson.dumps(customer_id or "N/A"), tail)).decode()
+
+    @staticmethod
+    @lru_cache(maxsize=512, typed=True)
+    def _classify_customer_segment_json_tail(r_score: int, f_score: int, m_score: int) -> bytes:
+        """Serialized classify result after its leading '{"customer_id":...,' member."""
+        result = CustomerSegmentTools._classify_customer_segment(r_score, f_score, m_score)
+        del result["customer_id"]
+        return orjson.dumps(result)[1:]
+
+    @staticmethod
+    def _classify_customer_segment(
+        r_score: int, f_score: int, m_score: int, customer_id: str | None = None
+    ) -> dict[str, Any]:
+        """Same as ``classify_customer_segment`` but returns the result dict unserialized."""
+        segment = _classify_rfm_segment(r_score, f_score, m_score)
+        info = _SEGMENT_INFO[segment]
 
         result = {
             "customer_id": customer_id or "N/A",
             "rfm_scores": {"recency": r_score, "frequency": f_score, "monetary": m_score},
             "segment": {
                 "name": segment,
-                "description": description,
-                "priority": priority,
-                "color": color,
+                "description": info.description,
+                "priority": info.priority,
+                "color": info.color,
             },
-            "recommended_actions": actions.get(segment, []),
-            "analysis": f"顧客セグメント: {segment}（優先度{priority}）- {description}",
+            "recommended_actions": list(_SEGMENT_ACTIONS[segment]),
+            "analysis": info.analysis,
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
+    @staticmethod
     def calculate_clv(
-        self,
         average_purchase_value: float,
         purchase_frequency_per_year: float,
         customer_lifespan_years: float = 3,
         profit_margin: float = 0.3,
         discount_rate: float = 0.1,
+        include_yearly_breakdown: bool = True,
     ) -> str:
         """
         Calculate Customer Lifetime Value.
@@ -273,10 +484,31 @@ class CustomerSegmentTools:
             customer_lifespan_years: Expected customer lifespan
             profit_margin: Profit margin (0-1)
             discount_rate: Discount rate for NPV
+            include_yearly_breakdown: Include the per-year NPV breakdown (default: True)
 
         Returns:
             JSON string with CLV calculation
         """
+        result = CustomerSegmentTools._calculate_clv(
+            average_purchase_value,
+            purchase_frequency_per_year,
+            customer_lifespan_years,
+            profit_margin,
+            discount_rate,
+            include_yearly_breakdown,
+        )
+        return to_json(result)
+
+    @staticmethod
+    def _calculate_clv(
+        average_purchase_value: float,
+        purchase_frequency_per_year: float,
+        customer_lifespan_years: float = 3,
+        profit_margin: float = 0.3,
+        discount_rate: float = 0.1,
+        include_yearly_breakdown: bool = True,
+    ) -> dict[str, Any]:
+        """Same as ``calculate_clv`` but returns the result dict unserialized."""
         # Annual revenue
         annual_revenue = average_purchase_value * purchase_frequency_per_year
 
@@ -286,20 +518,28 @@ class CustomerSegmentTools:
         # CLV with profit margin
         clv_profit = simple_clv * profit_margin
 
-        # NPV-based CLV (discounted)
-        npv_clv = 0
+        # NPV-based CLV (discounted) over whole years
+        annual_profit = annual_revenue * profit_margin
+        years = max(int(customer_lifespan_years), 0)
+        npv_clv = _annuity_npv(annual_profit, years, discount_rate)
+
         yearly_values = []
-        for year in range(1, int(customer_lifespan_years) + 1):
-            year_value = (annual_revenue * profit_margin) / ((1 + discount_rate) ** year)
-            npv_clv += year_value
-            yearly_values.append(
-                {
-                    "year": year,
-                    "revenue": round(annual_revenue, 0),
-                    "profit": round(annual_revenue * profit_margin, 0),
-                    "npv": round(year_value, 0),
-                }
-            )
+        if include_yearly_breakdown:
+            revenue = round(annual_revenue, 0)
+            profit = round(annual_profit, 0)
+            # Discount the previous year's value instead of raising (1 + d) to each year
+            growth = 1 + discount_rate
+            year_value = annual_profit
+            for year in range(1, years + 1):
+                year_value /= growth
+                yearly_values.append(
+                    {
+                        "year": year,
+                        "revenue": revenue,
+                        "profit": profit,
+                        "npv": round(year_value, 0),
+                    }
+                )
 
         # CLV tier
         if npv_clv >= 500000:
@@ -334,10 +574,10 @@ class CustomerSegmentTools:
             "analysis": f"CLV分析: 顧客生涯価値 ¥{npv_clv:,.0f}（{tier}ランク）- 年間 ¥{annual_revenue:,.0f} × {customer_lifespan_years}年",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
+    @staticmethod
     def recommend_next_action(
-        self,
         segment: str,
         rfm_scores: dict[str, int] | None = None,
         last_purchase_days: int | None = None,
@@ -353,88 +593,39 @@ class CustomerSegmentTools:
         Returns:
             JSON string with action recommendations
         """
-        # Action catalog by segment
-        action_catalog = {
-            "VIP顧客": {
-                "primary_action": "パーソナライズドサービス提供",
-                "channels": ["専任担当者", "電話", "限定イベント"],
-                "offer_type": "プレミアム特典",
-                "urgency": "通常",
-                "message_tone": "感謝・特別感",
-            },
-            "優良顧客": {
-                "primary_action": "ロイヤルティ強化施策",
-                "channels": ["メール", "アプリ通知", "DM"],
-                "offer_type": "ポイント還元・限定商品",
-                "urgency": "通常",
-                "message_tone": "感謝・インセンティブ",
-            },
-            "有望顧客": {
-                "primary_action": "アップセル/クロスセル提案",
-                "channels": ["メール", "Web", "アプリ"],
-                "offer_type": "セット割引・関連商品",
-                "urgency": "中",
-                "message_tone": "おすすめ・お得感",
-            },
-            "新規顧客": {
-                "primary_action": "オンボーディング完了",
-                "channels": ["メール", "アプリ", "LINE"],
-                "offer_type": "初回購入特典・チュートリアル",
-                "urgency": "高",
-                "message_tone": "歓迎・サポート",
-            },
-            "休眠優良顧客": {
-                "primary_action": "再活性化キャンペーン",
-                "channels": ["メール", "電話", "DM"],
-                "offer_type": "復帰特典・限定割引",
-                "urgency": "高",
-                "message_tone": "お久しぶり・特別オファー",
-            },
-            "離反リスク顧客": {
-                "primary_action": "緊急リテンション施策",
-                "channels": ["電話", "メール", "訪問"],
-                "offer_type": "大幅割引・サービス改善提案",
-                "urgency": "緊急",
-                "message_tone": "謝罪・改善約束",
-            },
-            "休眠顧客": {
-                "primary_action": "休眠掘り起こし",
-                "channels": ["メール", "郵送DM"],
-                "offer_type": "大幅割引・新商品案内",
-                "urgency": "低",
-                "message_tone": "新着情報・お得感",
-            },
-            "一般顧客": {
-                "primary_action": "定期エンゲージメント",
-                "channels": ["メール", "SNS"],
-                "offer_type": "季節キャンペーン",
-                "urgency": "低",
-                "message_tone": "情報提供",
-            },
-        }
+        result = CustomerSegmentTools._recommend_next_action(
+            segment, rfm_scores, last_purchase_days
+        )
+        return to_json(result)
 
+    @staticmethod
+    def _recommend_next_action(
+        segment: str,
+        rfm_scores: dict[str, int] | None = None,
+        last_purchase_days: int | None = None,
+    ) -> dict[str, Any]:
+        """Same as ``recommend_next_action`` but returns the result dict unserialized."""
         # Get action for segment (or default)
-        action_info = action_catalog.get(segment, action_catalog["一般顧客"])
-
-        # Adjust urgency based on last purchase days
-        if last_purchase_days is not None:
-            if last_purchase_days > 90 and segment not in ["休眠顧客", "離反リスク顧客"]:
-                action_info = action_info.copy()
-                action_info["urgency"] = "高"
-                action_info["additional_note"] = f"注意: {last_purchase_days}日間購入なし"
-
-        # Specific action items
-        action_items = []
-        if action_info["urgency"] == "緊急":
-            action_items = [
-                {"priority": 1, "action": "担当者による電話連絡", "deadline": "24時間以内"},
-                {"priority": 2, "action": "特別オファー準備", "deadline": "48時間以内"},
-                {"priority": 3, "action": "フォローアップメール送信", "deadline": "1週間以内"},
-            ]
-        elif action_info["urgency"] == "高":
+        action_info = _ACTION_CATALOG.get(segment, _ACTION_CATALOG["一般顧客"])
+
+        # Adjust urgency based on last purchase days (copy only when overriding)
+        if (
+            last_purchase_days is not None
+            and last_purchase_days > 90
+            and segment not in _URGENCY_OVERRIDE_EXEMPT
+        ):
+            action_info = {
+                **action_info,
+                "urgency": "高",
+                "additional_note": f"注意: {last_purchase_days}日間購入なし",
+            }
+
+        # Specific action items: fixed per urgency, else one channel-specific item
+        template = _ACTION_ITEMS_BY_URGENCY.get(action_info["urgency"])
+        if template is not None:
             action_items = [
-                {"priority": 1, "action": "パーソナライズドメール送信", "deadline": "3日以内"},
-                {"priority": 2, "action": "クーポン/オファー発行", "deadline": "1週間以内"},
+                {"priority": priority, "action": action, "deadline": deadline}
+                for priority, action, deadline in template
             ]
         else:
             action_items = [
@@ -451,7 +642,7 @@ class CustomerSegmentTools:
             "last_purchase_days": last_purchase_days,
             "recommendation": {
                 "primary_action": action_info["primary_action"],
-                "channels": action_info["channels"],
+                "channels": list(action_info["channels"]),
                 "offer_type": action_info["offer_type"],
                 "urgency": action_info["urgency"],
                 "message_tone": action_info["message_tone"],
@@ -460,4 +651,4 @@ class CustomerSegmentTools:
             "analysis": f"次のアクション: {action_info['primary_action']}（{action_info['urgency']}）- {action_info['channels'][0]}経由で{action_info['offer_type']}を提案",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
@@ -5,9 +5,11 @@ Provides tools for inventory management including turnover rate calculation,
 reorder point determination, and slow-moving inventory identification.
 """
 
-import json
+import math
 from typing import Any
 
+from ._json import to_json
+
 
 class InventoryAnalysisTools:
     """Inventory analysis and management tools."""
@@ -111,14 +113,24 @@ class InventoryAnalysisTools:
         Returns:
             JSON string with turnover analysis
         """
+        result = self._calculate_inventory_turnover(
+            cost_of_goods_sold, average_inventory, period_days, product_name
+        )
+        return to_json(result, indent=True)
+
+    def _calculate_inventory_turnover(
+        self,
+        cost_of_goods_sold: float,
+        average_inventory: float,
+        period_days: int = 365,
+        product_name: str | None = None,
+    ) -> dict[str, Any]:
+        """Same as ``calculate_inventory_turnover`` but returns the result dict unserialized."""
         if average_inventory <= 0:
-            return json.dumps(
-                {
-                    "error": "平均在庫は正の値である必要があります",
-                    "average_inventory": average_inventory,
-                },
-                ensure_ascii=False,
-            )
+            return {
+                "error": "平均在庫は正の値である必要があります",
+                "average_inventory": average_inventory,
+            }
 
         # Inventory turnover ratio
         turnover_ratio = cost_of_goods_sold / average_inventory
@@ -160,7 +172,7 @@ class InventoryAnalysisTools:
             "analysis": f"在庫回転分析: 回転率 {turnover_ratio:.2f}回 / 滞留日数 {days_in_inventory:.0f}日 - {rating}",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def calculate_reorder_point(
         self,
@@ -181,6 +193,19 @@ class InventoryAnalysisTools:
         Returns:
             JSON string with reorder point calculation
         """
+        result = self._calculate_reorder_point(
+            daily_demand, lead_time_days, safety_stock_days, demand_variability
+        )
+        return to_json(result, indent=True)
+
+    def _calculate_reorder_point(
+        self,
+        daily_demand: float,
+        lead_time_days: int,
+        safety_stock_days: int = 7,
+        demand_variability: float = 0.2,
+    ) -> dict[str, Any]:
+        """Same as ``calculate_reorder_point`` but returns the result dict unserialized."""
         # Lead time demand
         lead_time_demand = daily_demand * lead_time_days
 
@@ -232,7 +257,7 @@ class InventoryAnalysisTools:
             "analysis": f"発注点分析: 在庫が {reorder_point:.0f}個 を下回ったら発注（安全在庫 {final_safety_stock:.0f}個 含む）",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def identify_slow_moving_inventory(
         self, inventory_items: list[dict[str, Any]], slow_moving_threshold_days: int = 90
@@ -247,14 +272,26 @@ class InventoryAnalysisTools:
         Returns:
             JSON string with slow-moving inventory analysis
         """
+        result = self._identify_slow_moving_inventory(inventory_items, slow_moving_threshold_days)
+        return to_json(result, indent=True)
+
+    def _identify_slow_moving_inventory(
+        self, inventory_items: list[dict[str, Any]], slow_moving_threshold_days: int = 90
+    ) -> dict[str, Any]:
+        """Same as ``identify_slow_moving_inventory`` but returns the result dict unserialized."""
         if not inventory_items:
-            return json.dumps({"error": "在庫アイテムリストが空です"}, ensure_ascii=False)
+            return {"error": "在庫アイテムリストが空です"}
 
-        analyzed_items = []
+        # One output bucket per status, in risk order (dead stock first, then slow
+        # moving); concatenating them replaces a sort over the analyzed items.
+        dead_rows: list[dict[str, Any]] = []
+        slow_rows: list[dict[str, Any]] = []
+        healthy_rows: list[dict[str, Any]] = []
         dead_stock = []
         slow_moving = []
         healthy = []
         total_value_at_risk = 0
+        dead_stock_threshold_days = slow_moving_threshold_days * 2
 
         for item in inventory_items:
             name = item.get("name", "不明")
@@ -269,30 +306,31 @@ class InventoryAnalysisTools:
             if monthly_sales > 0:
                 months_of_stock = quantity / monthly_sales
             else:
-                months_of_stock = float("inf") if quantity > 0 else 0
+                months_of_stock = math.inf if quantity > 0 else 0
 
             # Classify
-            if days_in_stock > slow_moving_threshold_days * 2 or (
-                monthly_sales == 0 and quantity > 0
-            ):
+            if days_in_stock > dead_stock_threshold_days or (monthly_sales == 0 and quantity > 0):
                 status = "デッドストック"
                 color = "red"
                 dead_stock.append(name)
                 total_value_at_risk += inventory_value
                 action = "即時処分検討（セール/廃棄）"
+                rows = dead_rows
             elif days_in_stock > slow_moving_threshold_days or months_of_stock > 6:
                 status = "スローモービング"
                 color = "orange"
                 slow_moving.append(name)
                 total_value_at_risk += inventory_value * 0.5  # 50% risk
                 action = "販促強化/価格見直し"
+                rows = slow_rows
             else:
                 status = "正常"
                 color = "green"
                 healthy.append(name)
                 action = "現状維持"
+                rows = healthy_rows
 
-            analyzed_items.append(
+            rows.append(
                 {
                     "name": name,
                     "quantity": quantity,
@@ -301,7 +339,7 @@ class InventoryAnalysisTools:
                     "days_in_stock": days_in_stock,
                     "monthly_sales": monthly_sales,
                     "months_of_stock": round(months_of_stock, 1)
-                    if months_of_stock != float("inf")
+                    if months_of_stock != math.inf
                     else "∞",
                     "status": status,
                     "color": color,
@@ -309,9 +347,7 @@ class InventoryAnalysisTools:
                 }
             )
 
-        # Sort by risk (dead stock first, then slow moving)
-        status_order = {"デッドストック": 0, "スローモービング": 1, "正常": 2}
-        analyzed_items.sort(key=lambda x: status_order.get(x["status"], 3))
+        analyzed_items = dead_rows + slow_rows + healthy_rows
 
         result = {
             "analyzed_items": analyzed_items,
@@ -333,4 +369,4 @@ class InventoryAnalysisTools:
             "analysis": f"滞留在庫分析: デッドストック {len(dead_stock)}件、スローモービング {len(slow_moving)}件 - リスク金額 ¥{total_value_at_risk:,.0f}",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
@@ -5,9 +5,10 @@ Provides tools for product comparison, price-performance analysis,
 alternative suggestions, and bundle discount calculations.
 """
 
-import json
 from typing import Any
 
+from ._json import to_json
+
 
 class ProductComparisonTools:
     """Product comparison and recommendation tools."""
@@ -136,6 +137,13 @@ class ProductComparisonTools:
         Returns:
             JSON string with comparison result
         """
+        result = self._compare_products(product_a, product_b)
+        return to_json(result, indent=True)
+
+    def _compare_products(
+        self, product_a: dict[str, Any], product_b: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Same as ``compare_products`` but returns the result dict unserialized."""
         name_a = product_a.get("name", "製品A")
         name_b = product_b.get("name", "製品B")
         price_a = product_a.get("price", 0)
@@ -196,7 +204,7 @@ class ProductComparisonTools:
             "analysis": f"製品比較: {name_a} vs {name_b} - 価格差 ¥{abs(price_diff):,.0f}（{cheaper}が安い）",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def calculate_price_performance(
         self, price: float, performance_score: float, product_name: str = None
@@ -212,19 +220,21 @@ class ProductComparisonTools:
         Returns:
             JSON string with price-performance analysis
         """
+        result = self._calculate_price_performance(price, performance_score, product_name)
+        return to_json(result, indent=True)
+
+    def _calculate_price_performance(
+        self, price: float, performance_score: float, product_name: str = None
+    ) -> dict[str, Any]:
+        """Same as ``calculate_price_performance`` but returns the result dict unserialized."""
         if price <= 0:
-            return json.dumps(
-                {"error": "価格は正の値である必要があります", "price": price}, ensure_ascii=False
-            )
+            return {"error": "価格は正の値である必要があります", "price": price}
 
         if not (1 <= performance_score <= 100):
-            return json.dumps(
-                {
-                    "error": "性能スコアは1-100の範囲である必要があります",
-                    "performance_score": performance_score,
-                },
-                ensure_ascii=False,
-            )
+            return {
+                "error": "性能スコアは1-100の範囲である必要があります",
+                "performance_score": performance_score,
+            }
 
         # Calculate cost per performance point
         cost_per_point = price / performance_score
@@ -257,7 +267,7 @@ class ProductComparisonTools:
             "analysis": f"コスパ分析: {product_name or '対象製品'} - 価格 ¥{price:,.0f} / 性能 {performance_score}点 = {rating}",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def suggest_alternatives(
         self, base_product: dict[str, Any], candidates: list[dict[str, Any]]
@@ -272,8 +282,15 @@ class ProductComparisonTools:
         Returns:
             JSON string with ranked alternatives
         """
+        result = self._suggest_alternatives(base_product, candidates)
+        return to_json(result, indent=True)
+
+    def _suggest_alternatives(
+        self, base_product: dict[str, Any], candidates: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """Same as ``suggest_alternatives`` but returns the result dict unserialized."""
         if not candidates:
-            return json.dumps({"error": "代替候補製品のリストが空です"}, ensure_ascii=False)
+            return {"error": "代替候補製品のリストが空です"}
 
         base_name = base_product.get("name", "基準製品")
         base_price = base_product.get("price", 0)
@@ -342,7 +359,7 @@ class ProductComparisonTools:
             else "代替候補なし",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def calculate_bundle_discount(
         self, products: list[dict[str, Any]], discount_rules: dict[str, Any] = None
@@ -357,8 +374,15 @@ class ProductComparisonTools:
         Returns:
             JSON string with discount calculation
         """
+        result = self._calculate_bundle_discount(products, discount_rules)
+        return to_json(result, indent=True)
+
+    def _calculate_bundle_discount(
+        self, products: list[dict[str, Any]], discount_rules: dict[str, Any] = None
+    ) -> dict[str, Any]:
+        """Same as ``calculate_bundle_discount`` but returns the result dict unserialized."""
         if not products:
-            return json.dumps({"error": "製品リストが空です"}, ensure_ascii=False)
+            return {"error": "製品リストが空です"}
 
         # Default discount rules
         rules = discount_rules or {
@@ -422,4 +446,4 @@ class ProductComparisonTools:
             "analysis": f"バンドル割引: 小計 ¥{subtotal:,.0f} - 割引 ¥{total_discount:,.0f} = 最終価格 ¥{final_total:,.0f}（{(total_discount / subtotal * 100) if subtotal > 0 else 0:.1f}% OFF）",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
@@ -5,9 +5,10 @@ Provides tools for sales data analysis including growth rates, moving averages,
 ABC analysis, and sales forecasting.
 """
 
-import json
 from typing import Any
 
+from ._json import to_json
+
 
 class SalesAnalysisTools:
     """Sales analysis tools for business intelligence."""
@@ -126,6 +127,11 @@ class SalesAnalysisTools:
         Returns:
             JSON string with growth rate and change amount
         """
+        result = self._calculate_yoy_growth(current_value, previous_value)
+        return to_json(result, indent=True)
+
+    def _calculate_yoy_growth(self, current_value: float, previous_value: float) -> dict[str, Any]:
+        """Same as ``calculate_yoy_growth`` but returns the result dict unserialized."""
         if previous_value == 0:
             if current_value > 0:
                 growth_rate = float("inf")
@@ -150,7 +156,7 @@ class SalesAnalysisTools:
             "analysis": f"前年同期比: {growth_rate_str}（{trend}額: ¥{abs(change_amount):,.0f}）",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def calculate_mom_growth(self, current_value: float, previous_value: float) -> str:
         """
@@ -163,6 +169,11 @@ class SalesAnalysisTools:
         Returns:
             JSON string with growth rate and change amount
         """
+        result = self._calculate_mom_growth(current_value, previous_value)
+        return to_json(result, indent=True)
+
+    def _calculate_mom_growth(self, current_value: float, previous_value: float) -> dict[str, Any]:
+        """Same as ``calculate_mom_growth`` but returns the result dict unserialized."""
         if previous_value == 0:
             if current_value > 0:
                 growth_rate = float("inf")
@@ -187,7 +198,7 @@ class SalesAnalysisTools:
             "analysis": f"前月比: {growth_rate_str}（{trend}額: ¥{abs(change_amount):,.0f}）",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def calculate_moving_average(self, values: list[float], period: int = 3) -> str:
         """
@@ -200,21 +211,23 @@ class SalesAnalysisTools:
         Returns:
             JSON string with moving average values
         """
-        if len(values) < period:
-            return json.dumps(
-                {
-                    "error": f"データ数({len(values)})が期間({period})より少ないです",
-                    "values": values,
-                    "period": period,
-                },
-                ensure_ascii=False,
-            )
+        result = self._calculate_moving_average(values, period)
+        return to_json(result, indent=True)
 
-        moving_averages = []
-        for i in range(len(values) - period + 1):
-            window = values[i : i + period]
-            avg = sum(window) / period
-            moving_averages.append(round(avg, 2))
+    def _calculate_moving_average(self, values: list[float], period: int = 3) -> dict[str, Any]:
+        """Same as ``calculate_moving_average`` but returns the result dict unserialized."""
+        if len(values) < period:
+            return {
+                "error": f"データ数({len(values)})が期間({period})より少ないです",
+                "values": values,
+                "period": period,
+            }
+
+        # Sum each window from its own values; differencing running totals loses
+        # precision on large series and shifts the rounded averages
+        moving_averages = [
+            round(sum(values[i : i + period]) / period, 2) for i in range(len(values) - period + 1)
+        ]
 
         latest_ma = moving_averages[-1] if moving_averages else None
         trend = None
@@ -233,7 +246,7 @@ class SalesAnalysisTools:
             else "計算不可",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def calculate_abc_analysis(
         self, items: list[dict[str, Any]], a_threshold: float = 0.7, b_threshold: float = 0.9
@@ -249,15 +262,22 @@ class SalesAnalysisTools:
         Returns:
             JSON string with ABC classification
         """
+        result = self._calculate_abc_analysis(items, a_threshold, b_threshold)
+        return to_json(result, indent=True)
+
+    def _calculate_abc_analysis(
+        self, items: list[dict[str, Any]], a_threshold: float = 0.7, b_threshold: float = 0.9
+    ) -> dict[str, Any]:
+        """Same as ``calculate_abc_analysis`` but returns the result dict unserialized."""
         if not items:
-            return json.dumps({"error": "アイテムリストが空です"}, ensure_ascii=False)
+            return {"error": "アイテムリストが空です"}
 
         # Sort by value descending
         sorted_items = sorted(items, key=lambda x: x.get("value", 0), reverse=True)
 
         total_value = sum(item.get("value", 0) for item in sorted_items)
         if total_value == 0:
-            return json.dumps({"error": "合計値がゼロです"}, ensure_ascii=False)
+            return {"error": "合計値がゼロです"}
 
         # Calculate cumulative ratio and assign ranks
         cumulative = 0
@@ -304,7 +324,7 @@ class SalesAnalysisTools:
             "analysis": f"ABC分析結果: Aランク {len(a_items)}件（売上の{a_threshold * 100:.0f}%を占める重点商品）",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result
 
     def calculate_sales_forecast(
         self, historical_values: list[float], periods_ahead: int = 1
@@ -319,30 +339,26 @@ class SalesAnalysisTools:
         Returns:
             JSON string with forecast values
         """
+        result = self._calculate_sales_forecast(historical_values, periods_ahead)
+        return to_json(result, indent=True)
+
+    def _calculate_sales_forecast(
+        self, historical_values: list[float], periods_ahead: int = 1
+    ) -> dict[str, Any]:
+        """Same as ``calculate_sales_forecast`` but returns the result dict unserialized."""
         n = len(historical_values)
         if n < 2:
-            return json.dumps(
-                {"error": "予測には最低2期間のデータが必要です", "data_points": n},
-                ensure_ascii=False,
-            )
-
-        # Simple linear regression: y = a + b*x
-        x_values = list(range(1, n + 1))
-        y_values = historical_values
+            return {"error": "予測には最低2期間のデータが必要です", "data_points": n}
 
-        x_mean = sum(x_values) / n
-        y_mean = sum(y_values) / n
+        # Simple linear regression: y = a + b*x with x = 1..n
+        x_mean = (n + 1) / 2
+        y_mean = sum(historical_values) / n
 
-        # Calculate slope (b) and intercept (a)
-        numerator = sum(
-            (x - x_mean) * (y - y_mean) for x, y in zip(x_values, y_values, strict=True)
-        )
-        denominator = sum((x - x_mean) ** 2 for x in x_values)
-
-        if denominator == 0:
-            slope = 0
-        else:
-            slope = numerator / denominator
+        # Centered numerator Σ(x - x̄)(y - ȳ) avoids cancellation on large, flat series;
+        # the denominator Σ(x - x̄)² has the closed form n(n² - 1) / 12 for x = 1..n
+        numerator = sum((x - x_mean) * (y - y_mean) for x, y in enumerate(historical_values, 1))
+        denominator = n * (n * n - 1) / 12
+        slope = numerator / denominator
 
         intercept = y_mean - slope * x_mean
 
@@ -373,4 +389,4 @@ class SalesAnalysisTools:
             "analysis": f"売上予測: 次期予測 ¥{forecasts[0]['forecast_value']:,.0f}（{trend}傾向、1期あたり ¥{monthly_change:,.0f}の変動）",
         }
 
-        return json.dumps(result, ensure_ascii=False, indent=2)
+        return result